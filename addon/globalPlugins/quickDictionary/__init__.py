@@ -4,7 +4,7 @@
 # See the file COPYING for more details.
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
-from typing import Optional, Callable, List
+from typing import Any, Optional, Callable, Dict, List, Tuple
 import os.path
 import sys
 import addonHandler
@@ -15,6 +15,7 @@ import ui
 import gui
 import wx
 from threading import Thread
+from queue import Queue
 from globalVars import appArgs
 from scriptHandler import script
 from queueHandler import queueFunction, eventQueue
@@ -33,18 +34,32 @@ _libDir = os.path.join(os.path.dirname(__file__), "lib")
 if _libDir not in sys.path:
 	sys.path.append(_libDir)
 
-_addonDir = os.path.join(os.path.dirname(__file__), "..", "..")
-if isinstance(_addonDir, bytes):
-	_addonDir = _addonDir.decode("mbcs")
-_curAddon = addonHandler.Addon(_addonDir)
+# NVDA has already parsed the manifest of the running add-on, so the loaded object is reused
+try:
+	_curAddon = addonHandler.getCodeAddon()
+except addonHandler.AddonError:
+	# the add-on is running from the NVDA scratchpad
+	_addonDir = os.path.join(os.path.dirname(__file__), "..", "..")
+	if isinstance(_addonDir, bytes):
+		_addonDir = _addonDir.decode("mbcs")
+	_curAddon = addonHandler.Addon(_addonDir)
 addonName: str = _curAddon.manifest['name']
 addonSummary: str = _curAddon.manifest['summary']
 
 from .locator import services  # noqa E402
-from .shared import getSelectedText, translateWithCaching, hashForCache, waitingFor, messageWithLangDetection, finally_, htmlTemplate  # noqa E402
+from .shared import getSelectedText, translateWithCaching, hashForCache, waitingFor, messageWithLangDetection, finally_  # noqa E402
+from .shared import langNamesPair  # noqa E402
+from .template import htmlTemplate  # noqa E402
 from .synthesizers import profiles  # noqa E402
 from .settings import QDSettingsPanel, SynthesizersDialog, ServicesDialog, EditableInputDialog  # noqa E402
 from .service import Translator  # noqa E402
+from .cache import translationsCache  # noqa E402
+
+# Configuration scheme of the add-on together with the options of each online service
+confspec: Dict[str, Any] = {
+	"active": "integer(default=0,min=0,max=9)",
+	**{service.name: service.confspec for service in services}
+}
 
 
 class GlobalPlugin(globalPluginHandler.GlobalPlugin):
@@ -56,12 +71,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		super(GlobalPlugin, self).__init__(*args, **kwargs)
 		if appArgs.secure or config.isAppX:
 			return
-		confspec = {
-			"active": "integer(default=0,min=0,max=9)",
-		}
 		config.conf.spec[addonName] = confspec
-		for service in services:
-			config.conf.spec[addonName][service.name] = service.confspec
 		gui.settingsDialogs.NVDASettingsDialog.categoryClasses.append(QDSettingsPanel)
 		# to use the second layer of keyboard shortcuts
 		self._toggleGestures: bool = False
@@ -75,6 +85,16 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		self._cacheInfo: str = ''
 		# Sequence of messages
 		self._messages: List[str] = []
+		# the current language pair, prepared for announcement
+		self._pairKey: Optional[Tuple[int, str, str]] = None
+		self._codePair: str = ''
+		self._namePair: str = ''
+		# a single worker thread that performs the requests to the online services,
+		# the requests share the message queue and the last result, so they are not run in parallel.
+		# It is a daemon thread, so an unfinished request does not delay the NVDA shutdown
+		self._tasks: Queue = Queue()
+		self._worker = Thread(target=self._runTasks, name=addonName, daemon=True)
+		self._worker.start()
 		self.createSubMenu()
 
 	def createSubMenu(self) -> None:
@@ -115,13 +135,39 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		import webbrowser
 		webbrowser.open(helpFile)
 
+	@property
+	def _serviceConf(self) -> config.AggregatedSection:
+		"""Configuration section of the active online service.
+		@return: options of the active service
+		@rtype: config.AggregatedSection
+		"""
+		conf = config.conf[addonName]
+		return conf[services[conf['active']].name]
+
+	def _pairs(self) -> Tuple[str, str]:
+		"""The current language pair formatted for announcement, recalculated only when it changes.
+		The settings panels can change the languages directly in the configuration,
+		so the pair is compared with the configuration values, not only reset in the setters.
+		@return: pair of language codes and pair of language names
+		@rtype: Tuple[str, str]
+		"""
+		conf = config.conf[addonName]
+		active: int = conf['active']
+		serviceConf = conf[services[active].name]
+		key = (active, serviceConf['from'], serviceConf['into'])
+		if key != self._pairKey:
+			self._codePair = '%s - %s' % key[1:]
+			self._namePair = '%s - %s' % langNamesPair(*key)
+			self._pairKey = key
+		return self._codePair, self._namePair
+
 	@property
 	def source(self) -> str:
 		"""Source language for translation.
 		@return: usually two-character language code
 		@rtype: str
 		"""
-		return config.conf[addonName][services[config.conf[addonName]['active']].name]['from']
+		return self._serviceConf['from']
 
 	@source.setter
 	def source(self, lang: str) -> None:
@@ -129,7 +175,8 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		@param lang: usually two-character language code
 		@type lang: str
 		"""
-		config.conf[addonName][services[config.conf[addonName]['active']].name]['from'] = lang
+		self._serviceConf['from'] = lang
+		self._pairKey = None
 
 	@property
 	def target(self) -> str:
@@ -137,7 +184,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		@return: usually two-character language code
 		@rtype: str
 		"""
-		return config.conf[addonName][services[config.conf[addonName]['active']].name]['into']
+		return self._serviceConf['into']
 
 	@target.setter
 	def target(self, lang: str) -> None:
@@ -145,7 +192,8 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		@param lang: usually two-character language code
 		@type lang: str
 		"""
-		config.conf[addonName][services[config.conf[addonName]['active']].name]['into'] = lang
+		self._serviceConf['into'] = lang
+		self._pairKey = None
 
 	@property
 	def isCopyToClipboard(self) -> bool:
@@ -153,7 +201,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		@return: value stored in the add-on configuration
 		@rtype: bool
 		"""
-		return config.conf[addonName][services[config.conf[addonName]['active']].name]['copytoclip']
+		return self._serviceConf['copytoclip']
 
 	@property
 	def isAutoSwap(self) -> bool:
@@ -161,7 +209,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		@return: value stored in the add-on configuration
 		@rtype: bool
 		"""
-		return config.conf[addonName][services[config.conf[addonName]['active']].name]['autoswap']
+		return self._serviceConf['autoswap']
 
 	@property
 	def isSwitchSynth(self) -> bool:
@@ -174,6 +222,10 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 	def terminate(self, *args, **kwargs) -> None:
 		"""This will be called when NVDA is finished with this global plugin."""
 		super().terminate(*args, **kwargs)
+		if not (appArgs.secure or config.isAppX):
+			# the worker thread is not started on secure screens
+			self._tasks.put(None)
+			translationsCache.save()
 		try:
 			gui.settingsDialogs.NVDASettingsDialog.categoryClasses.remove(QDSettingsPanel)
 		except IndexError:
@@ -183,6 +235,26 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		except (RuntimeError, AttributeError):
 			log.warning("Can't remove %s submenu from NVDA menu", addonSummary)
 
+	def runInBackground(self, target: Callable, *args) -> None:
+		"""Run the function in the worker thread so as not to block NVDA.
+		@param target: the function to be performed
+		@type target: Callable
+		@param args: arguments passed to the function
+		"""
+		self._tasks.put((target, args))
+
+	def _runTasks(self) -> None:
+		"""Perform the queued functions one by one until the plugin is terminated."""
+		while True:
+			task = self._tasks.get()
+			if task is None:
+				break
+			target, args = task
+			try:
+				target(*args)
+			except Exception:
+				log.error("Error in the background task", exc_info=True)
+
 	def getScript(self, gesture: InputGesture) -> Callable:
 		"""Retrieve the script bound to a given gesture.
 		@param gesture: the input gesture in question
@@ -236,7 +308,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		text = getSelectedText()
 		if not text:
 			return
-		Thread(target=self.translate, args=[text, False]).start()
+		self.runInBackground(self.translate, text, False)
 
 	# Translators: Method description included in the add-on help message and NVDA input gestures dialog
 	@script(description="W - %s" % _("show dictionary entry in a separate browseable window"))
@@ -249,7 +321,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		text = getSelectedText()
 		if not text:
 			return
-		Thread(target=self.translate, args=[text, True]).start()
+		self.runInBackground(self.translate, text, True)
 
 	# Translators: Method description included in the add-on help message and NVDA input gestures dialog
 	@script(description="E - %s" % _("edit text before sending"))
@@ -267,7 +339,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			if result == wx.ID_OK:
 				if not dlg.text:
 					return
-				Thread(target=self.translate, args=[dlg.text, True]).start()
+				self.runInBackground(self.translate, dlg.text, True)
 		text = getSelectedText()
 		ed = EditableInputDialog(
 			parent=gui.mainFrame,
@@ -285,13 +357,10 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		@param gesture: gesture assigned to this method
 		@type gesture: InputGesture
 		"""
-		langs = services[config.conf[addonName]['active']].langs
+		langFrom, langInto = langNamesPair(config.conf[addonName]['active'], self.source, self.target)
 		ui.message(
 			# Translators: message presented to announce the current source and target languages.
-			_("Translate: from {langFrom} to {langInto}").format(
-				langFrom=langs[self.source].name,
-				langInto=langs[self.target].name
-			)
+			_("Translate: from {langFrom} to {langInto}").format(langFrom=langFrom, langInto=langInto)
 		)
 
 	# Translators: Method description included in the add-on help message and NVDA input gestures dialog
@@ -301,25 +370,22 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		@param gesture: gesture assigned to this method
 		@type gesture: InputGesture
 		"""
-		langs = services[config.conf[addonName]['active']].langs
-		if langs.isAvailable(self.target, self.source):
-			self.source, self.target = self.target, self.source
+		source, target = self.source, self.target
+		if services[config.conf[addonName]['active']].langs.isAvailable(target, source):
+			self.source, self.target = target, source
 			# Translators: Notification that languages ​​have been swapped
 			self._messages.append(_("Languages swapped"))
-			self._messages.append('%s - %s' % (self.source, self.target))
+			self._messages.append(self._pairs()[0])
 			text = getSelectedText()
 			if not text:
 				ui.message('...'.join(self._messages))
 				self._messages.clear()
 				return
-			Thread(target=self.translate, args=[text, False]).start()
+			self.runInBackground(self.translate, text, False)
 		else:
 			ui.message(
 				# Translators: Notification that reverse translation is not available for the current language pair
-				_("Swap languages is not available for this pair") + ": {source} - {target}".format(
-					source=langs[self.source].name,
-					target=langs[self.target].name
-				)
+				_("Swap languages is not available for this pair") + ": " + self._pairs()[1]
 			)
 
 	# Translators: Method description included in the add-on help message and NVDA input gestures dialog
@@ -333,11 +399,10 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			# Translators: Notification that no dictionary entries have been received in the current session
 			ui.message(_("There is no dictionary queries"))
 			return
-		service = services[getattr(self._lastTranslator, 'id', config.conf[addonName]['active'])]
 		api.copyToClip(self._lastTranslator.plaintext, notify=True)
-		ui.message('%s - %s' % (
-			service.langs[self._lastTranslator.langFrom].name,
-			service.langs[self._lastTranslator.langTo].name))
+		ui.message('%s - %s' % langNamesPair(
+			getattr(self._lastTranslator, 'id', config.conf[addonName]['active']),
+			self._lastTranslator.langFrom, self._lastTranslator.langTo))
 
 	# Translators: Method description included in the add-on help message and NVDA input gestures dialog
 	@script(description="U - %s" % _("download from online dictionary and save the current list of available languages"))  # noqa E501
@@ -358,7 +423,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			else:
 				# Translators: Notification when downloading from the online dictionary list of available languages
 				ui.message(_("Warning! The list of available languages could not be loaded."))
-		Thread(target=downloadLanguages).start()
+		self.runInBackground(downloadLanguages)
 
 	# Translators: Method description included in the add-on help message and NVDA input gestures dialog
 	@script(description="Q - %s" % _("statistics on the using the online service"))
@@ -588,9 +653,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		@param gesture: gesture assigned to this method
 		@type gesture: InputGesture
 		"""
-		current = profiles.getCurrent()
-		profile = profiles.restorePrevious()
-		profiles.rememberCurrent(current)
+		profile = profiles.swapPrevious(profiles.getCurrent())
 		ui.message(profile.title)
 
 	# Translators: Method description is displayed in the NVDA gestures dialog
@@ -637,7 +700,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 
 	def translate(self, text: str, isHtml: bool = False) -> None:
 		"""Retrieve the dictionary entry for the given word or phrase and display/announce the result.
-		This method must always be called in a separate thread so as not to block NVDA.
+		This method must always be called in the worker thread so as not to block NVDA.
 		@param text: a word or phrase to look up in a dictionary
 		@type text: str
 		@param isHtml: a sign of whether it is necessary to display the result of work in the form of HTML page
@@ -645,33 +708,34 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		"""
 		active = config.conf[addonName]['active']
 		langs = services[active].langs
-		pairs = [(self.source, self.target)]
+		source, target = self.source, self.target
+		pairs = [(source, target)]
 		if self.isAutoSwap:
-			if langs.isAvailable(self.target, self.source):
-				pairs.append((self.target, self.source))
+			if langs.isAvailable(target, source):
+				pairs.append((target, source))
+		# the service options do not change during the request, so their hash is calculated once
+		optionsHash: str = hashForCache(active)
 		for lFrom, lInto in pairs:
-			translator = translateWithCaching(lFrom, lInto, text, hashForCache(active))
-			if translator.error:
-				translateWithCaching.cache_clear()  # reset cache when HTTP errors occur
-			self._cacheInfo = str(translateWithCaching.cache_info())  # - to check the current status of queries cache
+			translator = translateWithCaching(lFrom, lInto, text, optionsHash)
+			self._cacheInfo = translationsCache.info()  # - to check the current status of queries cache
 			if translator.plaintext:
 				break
 		else:
-			if not translator.plaintext:
-				# Translators: Notification of missing dictionary entry for current request
-				ui.message(_("No results"))
-				self._messages.clear()
-				return
+			# Translators: Notification of missing dictionary entry for current request
+			ui.message(_("No results"))
+			self._messages.clear()
+			return
 		self._lastTranslator = translator
 		setattr(self._lastTranslator, 'id', active)
+		names = langNamesPair(active, translator.langFrom, translator.langTo)
 		if isHtml:
 			ui.browseableMessage(
 				message=translator.html,
-				title='%s-%s' % (langs[translator.langFrom].name, langs[translator.langTo].name),
+				title='%s-%s' % names,
 				isHtml=isHtml
 			)
 		else:
-			self._messages.append('%s - %s' % (langs[translator.langFrom].name, langs[translator.langTo].name))
+			self._messages.append('%s - %s' % names)
 			self._messages.append(translator.plaintext)
 			message = '...'.join(self._messages)
 			self._messages.clear()
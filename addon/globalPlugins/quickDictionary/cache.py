@@ -0,0 +1,158 @@
+# cache.py
+# Persistent storage of the responses received from online dictionaries
+# A part of the NVDA Quick Dictionary add-on
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
+
+from __future__ import annotations
+from typing import Any, Optional, Dict
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from time import time
+import config
+from logHandler import log
+from . import addonName
+
+
+class TranslationsCache(object):
+	"""Stores dictionary responses between NVDA sessions.
+	Entries expire after the specified lifetime, the least recently used entries are evicted first.
+	"""
+
+	def __init__(self, ttl: int = 48 * 3600, maxsize: int = 512) -> None:
+		"""Initialization of the cache parameters.
+		@param ttl: lifetime of the cache entry in seconds
+		@type ttl: int
+		@param maxsize: maximum number of entries stored in the cache
+		@type maxsize: int
+		"""
+		# an external file that stores cached responses
+		self._path: str = os.path.join(config.getUserDefaultConfigPath(), "%s-cache.json" % addonName)
+		self._ttl: int = ttl
+		self._maxsize: int = maxsize
+		# cached entries from the oldest to the most recently used
+		self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+		self._lock = Lock()
+		self._hits: int = 0
+		self._misses: int = 0
+		# the file is read on first use, so it does not delay the start of NVDA
+		self._loaded: bool = False
+		self._loadLock = Lock()
+
+	@staticmethod
+	def key(*args: Any) -> str:
+		"""Stable key of the cache entry, which does not change between NVDA sessions.
+		@param args: all values that identify the request to the online dictionary
+		@type args: Any
+		@return: hex digest of the received values
+		@rtype: str
+		"""
+		return hashlib.blake2b('|'.join(str(arg) for arg in args).encode('utf-8'), digest_size=16).hexdigest()
+
+	def get(self, key: str) -> Optional[Dict[str, Any]]:
+		"""Return the cached data if it is present and has not expired.
+		@param key: key of the cache entry
+		@type key: str
+		@return: previously saved data or None
+		@rtype: Optional[Dict[str, Any]]
+		"""
+		self._ensureLoaded()
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None or entry['ts'] < time() - self._ttl:
+				self._entries.pop(key, None)
+				self._misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self._hits += 1
+			return entry['data']
+
+	def put(self, key: str, data: Dict[str, Any]) -> None:
+		"""Save the data in the cache, evicting the least recently used entries if necessary.
+		@param key: key of the cache entry
+		@type key: str
+		@param data: serializable data to store
+		@type data: Dict[str, Any]
+		"""
+		self._ensureLoaded()
+		with self._lock:
+			self._entries[key] = {'ts': time(), 'data': data}
+			self._entries.move_to_end(key)
+			while len(self._entries) > self._maxsize:
+				self._entries.popitem(last=False)
+
+	def clear(self) -> None:
+		"""Remove all entries from the cache."""
+		with self._lock:
+			self._entries.clear()
+			self._hits = self._misses = 0
+			self._loaded = True
+
+	def info(self) -> str:
+		"""Information about the current state of the cache.
+		@return: number of hits and misses, maximum and current size of the cache
+		@rtype: str
+		"""
+		self._ensureLoaded()
+		return "hits=%d, misses=%d, maxsize=%d, currsize=%d" % (
+			self._hits, self._misses, self._maxsize, len(self._entries))
+
+	def load(self) -> TranslationsCache:
+		"""Load previously saved entries from an external file, skipping the expired ones.
+		@return: updated cache object
+		@rtype: TranslationsCache
+		"""
+		expired = time() - self._ttl
+		entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+		try:
+			with open(self._path, 'r', encoding='utf-8') as f:
+				data = json.load(f)
+			# the file may be damaged or written by another version of the add-on, so its structure is checked
+			for key, entry in data:
+				if isinstance(key, str) and isinstance(entry, dict) and 'data' in entry \
+					and isinstance(entry.get('ts'), (int, float)) and entry['ts'] >= expired:
+					entries[key] = entry
+		except FileNotFoundError:
+			pass
+		except Exception as e:
+			log.exception(e)
+			entries.clear()
+		with self._lock:
+			self._entries = entries
+			self._loaded = True
+		return self
+
+	def _ensureLoaded(self) -> None:
+		"""Load the saved entries from an external file if this has not been done yet."""
+		if not self._loaded:
+			with self._loadLock:
+				if not self._loaded:
+					self.load()
+
+	def save(self) -> bool:
+		"""Save the cache entries to an external file.
+		The data is written to a temporary file first, so the previous file is not corrupted if writing fails.
+		@return: a sign of the success of saving data to a file
+		@rtype: bool
+		"""
+		if not self._loaded:  # the cache was not used, the file remains unchanged
+			return True
+		with self._lock:
+			data = list(self._entries.items())
+		tmpPath: str = self._path + '.tmp'
+		try:
+			with open(tmpPath, 'w', encoding='utf-8') as f:
+				json.dump(data, f, ensure_ascii=False)
+			os.replace(tmpPath, self._path)
+		except Exception as e:
+			log.exception(e)
+			return False
+		return True
+
+
+# An instance of the cache for later use in the add-on
+translationsCache = TranslationsCache()
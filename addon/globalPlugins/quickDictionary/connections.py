@@ -0,0 +1,107 @@
+# connections.py
+# Persistent HTTPS connections to the online dictionaries servers
+# A part of the NVDA Quick Dictionary add-on
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
+
+from typing import Dict, List, Optional, Tuple
+import ssl
+import gzip
+import zlib
+from http.client import HTTPSConnection, HTTPResponse, RemoteDisconnected
+from threading import Lock
+from urllib.parse import urlsplit
+
+# Idle persistent connections to the API servers, shared by all threads
+_pool: Dict[Tuple[str, ssl.SSLContext], List[HTTPSConnection]] = {}
+_poolLock = Lock()
+# Maximum number of idle connections kept open to each host
+_maxIdle: int = 2
+# A single verified TLS context shared by all connections by default
+defaultContext = ssl.create_default_context()
+
+
+def getConnection(host: str, context: Optional[ssl.SSLContext] = None) -> HTTPSConnection:
+	"""Takes an idle connection to the specified host from the pool or opens a new one.
+	The connection is used by one thread only, until it is returned by releaseConnection.
+	@param host: domain name of the server
+	@type host: str
+	@param context: TLS context used when opening a new connection
+	@type context: Optional[ssl.SSLContext]
+	@return: HTTPS connection to the host
+	@rtype: HTTPSConnection
+	"""
+	context = context or defaultContext
+	with _poolLock:
+		idle: List[HTTPSConnection] = _pool.get((host, context), [])
+		if idle:
+			return idle.pop()
+	return HTTPSConnection(host, timeout=8, context=context)
+
+
+def releaseConnection(host: str, conn: HTTPSConnection, context: Optional[ssl.SSLContext] = None) -> None:
+	"""Returns the connection to the pool so that it is reused by subsequent requests.
+	@param host: domain name of the server
+	@type host: str
+	@param conn: connection whose response has been read completely
+	@type conn: HTTPSConnection
+	@param context: TLS context with which the connection was opened
+	@type context: Optional[ssl.SSLContext]
+	"""
+	with _poolLock:
+		idle: List[HTTPSConnection] = _pool.setdefault((host, context or defaultContext), [])
+		if len(idle) < _maxIdle:
+			idle.append(conn)
+			return
+	conn.close()
+
+
+def fetch(
+	url: str,
+	headers: Dict[str, str],
+	context: Optional[ssl.SSLContext] = None
+) -> Tuple[HTTPResponse, bytes]:
+	"""Performs a GET request over a persistent connection and returns the decompressed response body.
+	The server may close an idle keep-alive connection, in this case the request is repeated over another one.
+	Other errors, such as a timeout, are raised at once, so a server that does not respond is not queried again.
+	@param url: full URL of the requested resource
+	@type url: str
+	@param headers: HTTP headers of the request
+	@type headers: Dict[str, str]
+	@param context: TLS context used when opening a new connection
+	@type context: Optional[ssl.SSLContext]
+	@return: the server response and its body
+	@rtype: Tuple[HTTPResponse, bytes]
+	@raise Exception: if the request fails
+	"""
+	parts = urlsplit(url)
+	path: str = parts.path + ('?' + parts.query if parts.query else '')
+	while True:
+		conn: HTTPSConnection = getConnection(parts.netloc, context)
+		# a connection taken from the pool is already open, a new one is opened by the request
+		reused: bool = conn.sock is not None
+		try:
+			conn.request('GET', path, headers=dict(headers, **{'Accept-Encoding': 'gzip, deflate'}))
+			resp: HTTPResponse = conn.getresponse()
+			data: bytes = resp.read()
+		except (RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+			conn.close()
+			if reused:
+				# the server has closed the idle connection, the request is repeated over another one
+				continue
+			raise
+		except Exception:
+			conn.close()
+			raise
+		if resp.will_close:
+			conn.close()
+		else:
+			releaseConnection(parts.netloc, conn, context)
+		break
+	encoding: str = resp.getheader('Content-Encoding', '')
+	if encoding == 'gzip':
+		data = gzip.decompress(data)
+	elif encoding == 'deflate':
+		data = zlib.decompress(data)
+	return resp, data
@@ -9,18 +9,29 @@ from typing import Any, Dict, List, Optional
 import os.path
 import ssl
 import base64
-from urllib.request import Request, urlopen
 from urllib.parse import quote as urlencode
 from http.client import HTTPResponse
-from json import loads
 from datetime import datetime, timedelta
 import config
 from .. import addonName
 from ..service import secrets
+from ..connections import fetch
+
+try:
+	# orjson is much faster, but it is not shipped with NVDA
+	from orjson import loads
+except ImportError:
+	from json import loads
 
-ssl._create_default_https_context = ssl._create_unverified_context
 serviceName: str = os.path.basename(os.path.dirname(__file__))
 stat: Dict[str, Any] = {}  # Object for store statistics
+# Certificates of the server are not verified, but only for the requests of this service
+_sslContext = ssl._create_unverified_context()
+# HTTP headers sent with every request to the service, the access key is added to them separately
+_headers: Dict[str, str] = {
+	"X-RapidAPI-Host": "lexicala1.p.rapidapi.com",
+	"User-Agent": "Mozilla 5.0"
+}
 
 
 class Lapi(object):
@@ -56,10 +67,6 @@ class Lapi(object):
 		self._source = source
 		self._morph = morph
 		self._analyzed = analyzed
-		self._headers: Dict[str, str] = {
-			"X-RapidAPI-Host": "lexicala1.p.rapidapi.com",
-			"User-Agent": "Mozilla 5.0"
-		}
 
 	@property
 	def text(self) -> str:
@@ -113,28 +120,31 @@ class Lapi(object):
 		response: Dict = {}
 		resp: Optional[HTTPResponse] = None
 		url: str = self._url + query
-		rq = Request(url)
-		for name, value in self._headers.items():
-			rq.add_header(name, value)
-		rq.add_header("X-RapidAPI-Key", secrets[serviceName].decode(config.conf[addonName][serviceName]['password']))
+		headers: Dict[str, str] = dict(
+			_headers,
+			**{"X-RapidAPI-Key": secrets[serviceName].decode(config.conf[addonName][serviceName]['password'])})
 		try:
-			resp = urlopen(rq, timeout=8)
+			# The connection to the server is kept open between requests
+			resp, data = fetch(url, headers, context=_sslContext)
 		except Exception as e:
-			# e.getcode()==429 -> "To date, the number of allowed queries to the dictionary is exhausted!"
 			response['error'] = "HTTP error: %s" % str(e)
 			return response
+		if resp.status >= 400:
+			# 429 -> "To date, the number of allowed queries to the dictionary is exhausted!"
+			response['error'] = "HTTP error: HTTP Error %d: %s" % (resp.status, resp.reason)
+			return response
 		if resp:
 			stat['remain'] = resp.getheader("X-RateLimit-requests-Remaining", 0)
 			stat['count'] = int(resp.getheader("X-RateLimit-requests-Limit", 0)) - int(stat['remain'])
 			stat['delta'] = datetime.now() - self.parseDate(resp.getheader('date', ''))
-			if resp.getcode() == 200:
-				text: str = resp.read().decode(encoding='utf-8', errors='ignore')
+			if resp.status == 200:
 				try:
-					response = loads(text)
+					# both parsers accept bytes and detect the UTF encoding themselves
+					response = loads(data)
 				except Exception as e:
 					response['error'] = "JSON error: %s" % str(e)
 			else:
-				response['error'] = "Response code: %d" % resp.getcode()
+				response['error'] = "Response code: %d" % resp.status
 		return response
 
 	def search(self) -> Dict:
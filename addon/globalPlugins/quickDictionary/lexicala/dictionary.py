@@ -12,7 +12,7 @@ import config
 from logHandler import log
 from .. import addonName
 from ..service import Translator, Parser, secrets
-from ..shared import htmlTemplate
+from ..template import htmlTemplate
 from .languages import langs
 from .api import Lapi, serviceName
 
@@ -111,6 +111,8 @@ class ServiceParser(Parser):
 		super(ServiceParser, self).__init__(response)
 		self._langFrom: str = ''
 		self._langInto: str = target
+		# the results are rendered only once, even if they turn out to be empty
+		self._rendered: bool = False
 
 	def results(self) -> str:
 		"""Analysis of the list of results.
@@ -797,6 +799,7 @@ class ServiceParser(Parser):
 		@return: found data in HTML format
 		@rtype: str
 		"""
-		if not self.html:
+		if not self._rendered:
 			self.html = self.results().replace('\u02c8', '')
+			self._rendered = True
 		return self.html
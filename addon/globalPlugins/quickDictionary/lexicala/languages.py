@@ -5,7 +5,7 @@
 # See the file COPYING for more details.
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
-from typing import List, Dict, Iterator
+from typing import List, Dict, Iterator, FrozenSet, Tuple
 import os.path
 import config
 from .. import addonName
@@ -22,13 +22,15 @@ class ServiceLanguage(Language):
 		@return: language name
 		@rtype: str
 		"""
-		code = {  # a detailed list of used languages can be found in the <languages.json> file
-			'br': 'pt_br',  # Brazilian Portuguese
-			'da': 'fr_ca',  # Canadian French
-			'dk': 'da',  # Danish
-			'tw': 'zh_tw',  # Traditional Chinese
-		}.get(self.code, self.code)
-		return super(ServiceLanguage, self).getName(code)
+		if self._name is None:
+			code = {  # a detailed list of used languages can be found in the <languages.json> file
+				'br': 'pt_br',  # Brazilian Portuguese
+				'da': 'fr_ca',  # Canadian French
+				'dk': 'da',  # Danish
+				'tw': 'zh_tw',  # Traditional Chinese
+			}.get(self.code, self.code)
+			self._name = super(ServiceLanguage, self).getName(code)
+		return self._name
 
 
 class ServiceLanguages(Languages):
@@ -43,6 +45,8 @@ class ServiceLanguages(Languages):
 		"""
 		super(ServiceLanguages, self).__init__(file)
 		self._Language = ServiceLanguage
+		# codes of the source and target languages of each source dictionary
+		self._codes: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
 
 	@property
 	def sources(self) -> List[str]:
@@ -99,7 +103,7 @@ class ServiceLanguages(Languages):
 		"""
 		source = source or self.source
 		for lang in self._langs.get('resources', {}).get(source, {}).get('source_languages', []):
-			yield ServiceLanguage(lang)
+			yield self[lang]
 
 	def intoList(self, source: str = '') -> Iterator[ServiceLanguage]:
 		"""Sequence of available target languages.
@@ -110,7 +114,7 @@ class ServiceLanguages(Languages):
 		"""
 		source = source or self.source
 		for lang in self._langs.get('resources', {}).get(source, {}).get('target_languages', []):
-			yield ServiceLanguage(lang)
+			yield self[lang]
 
 	def isAvailable(self, source: str, target: str) -> bool:
 		"""Indicates whether the selected language pair is in the list of available languages.
@@ -121,11 +125,22 @@ class ServiceLanguages(Languages):
 		@return: whether a language pair is present in the list of available
 		@rtype: bool
 		"""
-		return (source in [
-			lang.code for lang in self.fromList()
-		]) and (target in [
-			lang.code for lang in self.intoList()
-		])
+		fromCodes, intoCodes = self.codes(self.source)
+		return source in fromCodes and target in intoCodes
+
+	def codes(self, source: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+		"""Codes of the source and target languages of the dictionary, prepared on first use.
+		@param source: source dictionary name
+		@type source: Literal["global", "password", "random"]
+		@return: sets of the source and target language codes
+		@rtype: Tuple[FrozenSet[str], FrozenSet[str]]
+		"""
+		if source not in self._codes:
+			resource: Dict = self._langs.get('resources', {}).get(source, {})
+			self._codes[source] = (
+				frozenset(resource.get('source_languages', [])),
+				frozenset(resource.get('target_languages', [])))
+		return self._codes[source]
 
 	@property
 	def defaultFrom(self) -> ServiceLanguage:
@@ -5,8 +5,9 @@
 # See the file COPYING for more details.
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
-from typing import Callable, Iterator, Optional
+from typing import Callable, Iterable, Optional, Dict, List, Tuple
 import addonHandler
+from locale import strxfrm
 import wx
 import config
 from gui import guiHelper
@@ -22,6 +23,21 @@ except addonHandler.AddonError:
 	log.warning("Unable to init translations. This may be because the addon is running from NVDA scratchpad.")
 _: Callable[[str], str]
 
+# Source and target languages of each source dictionary, prepared on first selection of the dictionary
+_choices: Dict[str, Tuple[List[ServiceLanguage], List[ServiceLanguage]]] = {}
+
+
+def languageChoices(source: str) -> Tuple[List[ServiceLanguage], List[ServiceLanguage]]:
+	"""Source and target languages available in the specified source dictionary.
+	@param source: source dictionary name
+	@type source: str
+	@return: lists of source and target languages
+	@rtype: Tuple[List[ServiceLanguage], List[ServiceLanguage]]
+	"""
+	if source not in _choices:
+		_choices[source] = list(langs.fromList(source=source)), list(langs.intoList(source=source))
+	return _choices[source]
+
 
 class ServicePanel(wx.Panel):
 	"""The Settings Panel that specific to the current service."""
@@ -39,8 +55,11 @@ class ServicePanel(wx.Panel):
 		@type id: int
 		"""
 		super(ServicePanel, self).__init__(parent, id)
+		section = config.conf[addonName][serviceName]
 		addonHelper = guiHelper.BoxSizerHelper(self, orientation=wx.VERTICAL)
 		self.SetSizer(addonHelper.sizer)
+		# The panel is not redrawn until all controls are added
+		self.Freeze()
 		self.sourceChoice = addonHelper.addLabeledControl(
 			# Translators: A setting in addon settings dialog.
 			_("&Dictionary:"),
@@ -48,7 +67,7 @@ class ServicePanel(wx.Panel):
 			choices=langs.sources,
 			style=wx.CB_SORT
 		)
-		currentSource: int = self.sourceChoice.FindString(config.conf[addonName][serviceName]['source'])
+		currentSource: int = self.sourceChoice.FindString(section['source'])
 		self.sourceChoice.Select(currentSource)
 		self.sourceChoice.Bind(wx.EVT_CHOICE, self.onSelectSource)
 		addonHelper.addItem(
@@ -60,49 +79,47 @@ class ServicePanel(wx.Panel):
 			# Translators: A setting in addon settings dialog.
 			_("&Source language:"),
 			wx.Choice,
-			choices=[],
-			style=wx.CB_SORT
+			choices=[]
 		)
 		self.intoChoice = languageHelper.addLabeledControl(
 			# Translators: A setting in addon settings dialog.
 			_("&Target language:"),
 			wx.Choice,
-			choices=[],
-			style=wx.CB_SORT
+			choices=[]
 		)
 		addonHelper.addItem(languageHelper)
-		self.widgetMaker(self.fromChoice, langs.fromList(source=config.conf[addonName][serviceName]['source']))
-		self.widgetMaker(self.intoChoice, langs.intoList(source=config.conf[addonName][serviceName]['source']))
-		langFrom: int = self.fromChoice.FindString(langs[config.conf[addonName][serviceName]['from']].name)
-		langTo: int = self.intoChoice.FindString(langs[config.conf[addonName][serviceName]['into']].name)
-		self.fromChoice.Select(langFrom)
-		self.intoChoice.Select(langTo)
+		fromLangs, intoLangs = languageChoices(section['source'])
+		# positions of the languages in the choice lists by their codes
+		self._fromIndex: Dict[str, int] = self.widgetMaker(self.fromChoice, fromLangs)
+		self._intoIndex: Dict[str, int] = self.widgetMaker(self.intoChoice, intoLangs)
+		self.fromChoice.Select(self._fromIndex.get(section['from'], wx.NOT_FOUND))
+		self.intoChoice.Select(self._intoIndex.get(section['into'], wx.NOT_FOUND))
 
 		self.morphChk = addonHelper.addItem(
 			# Translators: A setting in addon settings dialog.
 			wx.CheckBox(self, label=_("Search in both headwords and &inflections"))
 		)
-		self.morphChk.SetValue(config.conf[addonName][serviceName]['morph'])
+		self.morphChk.SetValue(section['morph'])
 		self.analyzedChk = addonHelper.addItem(
 			# Translators: A setting in addon settings dialog.
 			wx.CheckBox(self, label=_("St&rip words to their stem"))
 		)
-		self.analyzedChk.SetValue(config.conf[addonName][serviceName]['analyzed'])
+		self.analyzedChk.SetValue(section['analyzed'])
 		self.allChk = addonHelper.addItem(
 			# Translators: A setting in addon settings dialog.
 			wx.CheckBox(self, label=_("Show a&ll available translations"))
 		)
-		self.allChk.SetValue(config.conf[addonName][serviceName]['all'])
+		self.allChk.SetValue(section['all'])
 		self.copyToClipboardChk = addonHelper.addItem(
 			# Translators: A setting in addon settings dialog.
 			wx.CheckBox(self, label=_("Copy dictionary response to clip&board"))
 		)
-		self.copyToClipboardChk.SetValue(config.conf[addonName][serviceName]['copytoclip'])
+		self.copyToClipboardChk.SetValue(section['copytoclip'])
 		self.autoSwapChk = addonHelper.addItem(
 			# Translators: A setting in addon settings dialog.
 			wx.CheckBox(self, label=_("Auto-s&wap languages"))
 		)
-		self.autoSwapChk.SetValue(config.conf[addonName][serviceName]['autoswap'])
+		self.autoSwapChk.SetValue(section['autoswap'])
 
 		# Fields for input user credentials and link to registration
 		secret = secrets[serviceName]
@@ -111,14 +128,14 @@ class ServicePanel(wx.Panel):
 			# Translators: A setting in addon settings dialog.
 			_("&Username:"),
 			wx.TextCtrl,
-			value=secret.decode(config.conf[addonName][serviceName]['username']),
+			value=secret.decode(section['username']),
 			style=wx.TE_LEFT
 		)
 		self.passwordInput = authHelper.addLabeledControl(
 			# Translators: A setting in addon settings dialog.
 			_("&Password:"),
 			wx.TextCtrl,
-			value=secret.decode(config.conf[addonName][serviceName]['password']),
+			value=secret.decode(section['password']),
 			style=wx.TE_LEFT | wx.TE_PASSWORD
 		)
 		addonHelper.addItem(authHelper)
@@ -137,48 +154,74 @@ class ServicePanel(wx.Panel):
 			show=self.usernameInput.GetValue() == secret.username and self.passwordInput.GetValue() == secret.password
 		)
 		addonHelper.sizer.Fit(self)
+		self.Thaw()
+		# The options are saved only if the user has changed any of them
+		self._changed: bool = False
+		for eventType in (wx.EVT_CHOICE, wx.EVT_CHECKBOX, wx.EVT_TEXT):
+			self.Bind(eventType, self.onChange)
+
+	def onChange(self, event: wx.PyEvent) -> None:
+		"""Mark the panel options as changed by the user.
+		@param event: event of any control of the panel which changes its value
+		@type event: wx.PyEvent
+		"""
+		self._changed = True
+		event.Skip()
 
 	def onSelectSource(self, event: wx.PyEvent) -> None:
 		"""Fill in the lists of source and target languages when selecting source dictionary.
 		@param event: event indicating the selection of an item in the wx.Choice object
 		@type event: wx.PyEvent
 		"""
-		source: str = event.GetString()
+		self._changed = True
+		fromLangs, intoLangs = languageChoices(event.GetString())
 		self.fromChoice.Clear()
-		self.widgetMaker(self.fromChoice, langs.fromList(source=source))
+		self._fromIndex = self.widgetMaker(self.fromChoice, fromLangs)
 		self.intoChoice.Clear()
-		self.widgetMaker(self.intoChoice, langs.intoList(source=source))
-		langFrom: int = self.fromChoice.FindString(langs[config.conf[addonName][serviceName]['from']].name)
-		langTo: int = self.intoChoice.FindString(langs[config.conf[addonName][serviceName]['into']].name)
-		langFrom = max(0, langFrom)
-		langTo = max(0, langTo)
-		self.fromChoice.Select(langFrom)
-		self.intoChoice.Select(langTo)
+		self._intoIndex = self.widgetMaker(self.intoChoice, intoLangs)
+		section = config.conf[addonName][serviceName]
+		self.fromChoice.Select(self._fromIndex.get(section['from'], 0))
+		self.intoChoice.Select(self._intoIndex.get(section['into'], 0))
 
-	def widgetMaker(self, widget: wx.Choice, languages: Iterator[ServiceLanguage]) -> None:
+	def widgetMaker(self, widget: wx.Choice, languages: Iterable[ServiceLanguage]) -> Dict[str, int]:
 		"""Creating a widget based on the sequence of Language classes to display it in a wx.Choice object.
 		@param widget: widget based on a sequence of Language classes
 		@type widget: wx.Choice
 		@param languages: list of languages available in the dictionary
-		@type languages: Iterator[ServiceLanguage]
+		@type languages: Iterable[ServiceLanguage]
+		@return: positions of the added languages in the widget by their codes
+		@rtype: Dict[str, int]
 		"""
-		for lang in languages:
-			widget.Append(lang.name, lang)
+		# The control is not redrawn until all items are added
+		widget.Freeze()
+		# Languages are sorted once here instead of by the native control on each insertion
+		languages = sorted(languages, key=lambda lang: strxfrm(lang.name))
+		positions: Dict[str, int] = {}
+		if languages:
+			first: int = widget.GetCount()
+			widget.Append([lang.name for lang in languages])
+			for index, lang in enumerate(languages, start=first):
+				widget.SetClientData(index, lang)
+				positions[lang.code] = index
+		widget.Thaw()
+		return positions
 
 	def save(self) -> None:
 		"""Save the state of the service panel settings."""
-		config.conf[addonName][serviceName]['source'] = self.sourceChoice.GetString(
-			self.sourceChoice.GetSelection())
+		if not self._changed:
+			return
+		section = config.conf[addonName][serviceName]
+		section['source'] = self.sourceChoice.GetString(self.sourceChoice.GetSelection())
 		fromLang: str = self.fromChoice.GetClientData(self.fromChoice.GetSelection()).code
 		intoLang: str = self.intoChoice.GetClientData(self.intoChoice.GetSelection()).code
-		config.conf[addonName][serviceName]['from'] = fromLang
-		config.conf[addonName][serviceName]['into'] = intoLang
-		config.conf[addonName][serviceName]['morph'] = self.morphChk.GetValue()
-		config.conf[addonName][serviceName]['analyzed'] = self.analyzedChk.GetValue()
-		config.conf[addonName][serviceName]['all'] = self.allChk.GetValue()
-		config.conf[addonName][serviceName]['copytoclip'] = self.copyToClipboardChk.GetValue()
-		config.conf[addonName][serviceName]['autoswap'] = self.autoSwapChk.GetValue()
-		config.conf[addonName][serviceName]['username'] = secrets[serviceName].encode(
+		section['from'] = fromLang
+		section['into'] = intoLang
+		section['morph'] = self.morphChk.GetValue()
+		section['analyzed'] = self.analyzedChk.GetValue()
+		section['all'] = self.allChk.GetValue()
+		section['copytoclip'] = self.copyToClipboardChk.GetValue()
+		section['autoswap'] = self.autoSwapChk.GetValue()
+		section['username'] = secrets[serviceName].encode(
 			self.usernameInput.GetValue() or secrets[serviceName].username)
-		config.conf[addonName][serviceName]['password'] = secrets[serviceName].encode(
+		section['password'] = secrets[serviceName].encode(
 			self.passwordInput.GetValue() or secrets[serviceName].password)
@@ -14,7 +14,7 @@
 """
 
 from __future__ import annotations
-from typing import Callable, Union, List, Dict, Iterator
+from typing import Callable, Union, List, Dict, Iterator, Optional
 import addonHandler
 import os.path
 import json
@@ -35,6 +35,12 @@ except addonHandler.AddonError:
 	log.warning("Unable to init translations. This may be because the addon is running from NVDA scratchpad.")
 _: Callable[[str], str]
 
+# HTML tags removed when converting a dictionary article to plain text
+_htmlTags = re.compile(r'\<[^>]*\>')
+# Line breaks together with the empty lines between them
+_lineBreaks = re.compile(r'\n+')
+# Masked credentials and their restored values, decoding depends only on the masked string
+_decoded: Dict[str, str] = {}
 
 # Languages which may not be in the main list
 langNames = {
@@ -84,6 +90,8 @@ class Language(metaclass=ABCMeta):
 		self._lang: str = code
 		# additional languages, where key is a two-character code and value is name of the language
 		self._names: Dict[str, str] = langNames
+		# the full name of the language, determined on the first request
+		self._name: Optional[str] = None
 
 	@property
 	def code(self) -> str:
@@ -99,7 +107,9 @@ class Language(metaclass=ABCMeta):
 		@return: language name
 		@rtype: str
 		"""
-		return self.getName()
+		if self._name is None:
+			self._name = self.getName()
+		return self._name
 
 	def getName(self, code: str = '') -> str:
 		"""Full language name.
@@ -133,6 +143,8 @@ class Languages(metaclass=ABCMeta):
 		self._all: List[Language] = []
 		self._file = file
 		self._langs: Dict = self.load()
+		# Language objects already created for the requested codes
+		self._byCode: Dict[str, Language] = {}
 
 	def load(self) -> Dict:
 		"""Load a collection of available language pairs from an external json file.
@@ -191,7 +203,9 @@ class Languages(metaclass=ABCMeta):
 		@return: the Language object for the given code
 		@rtype: Language
 		"""
-		return self._Language(lang)
+		if lang not in self._byCode:
+			self._byCode[lang] = self._Language(lang)
+		return self._byCode[lang]
 
 	# The following methods and properties must be overridden in the child class
 	@abstractmethod
@@ -353,6 +367,30 @@ class Translator(Thread):
 		"""
 		return 0
 
+	def toDict(self) -> Dict:
+		"""Convert the processed response stored in the object to a dict type.
+		@return: dict, which contains the received and processed response
+		@rtype: Dict
+		"""
+		return {
+			"resp": self._resp,
+			"html": self._html,
+			"plaintext": self._plaintext
+		}
+
+	def fromDict(self, rec: Dict) -> Translator:
+		"""Initialize the response fields of the current object from the obtained parameter.
+		Used to restore a previously received response without querying the remote dictionary.
+		@param rec: dict object with required keys
+		@type rec: Dict
+		@return: updated object with the obtained data
+		@rtype: Translator
+		"""
+		self._resp = rec.get('resp') or {}
+		self._html = rec.get('html') or ''
+		self._plaintext = rec.get('plaintext') or ''
+		return self
+
 	def run(self) -> None:
 		"""Query the remote dictionary and save the processed response.
 		Should run in a separate thread to avoid blocking.
@@ -364,6 +402,7 @@ class Parser(metaclass=ABCMeta):
 	"""Parse the deserialized response from the server and returns it in HTML and text formats.
 	The child class must override the to_html() method.
 	"""
+	__slots__ = ('resp', 'html')
 
 	def __init__(self, response: Dict) -> None:
 		"""Input deserialized data for further analysis and conversion to other formats.
@@ -391,9 +430,8 @@ class Parser(metaclass=ABCMeta):
 		h1: str = "- "
 		text: str = self.html or self.to_html()
 		text = text.replace('<li>', li).replace('<h1>', h1)
-		text = re.sub(r'\<[^>]*\>', '', text)
-		text = '\r\n'.join((s for s in text.split('\n') if s))
-		return text
+		text = _htmlTags.sub('', text)
+		return _lineBreaks.sub('\r\n', text.strip('\n'))
 
 
 class Secret(object):
@@ -484,10 +522,12 @@ class Secret(object):
 		@return: restored data string in its original form
 		@rtype: str
 		"""
-		try:
-			return zlib.decompress(binascii.unhexlify(cred.encode('utf-8'))).decode()
-		except Exception:
-			return ''
+		if cred not in _decoded:
+			try:
+				_decoded[cred] = zlib.decompress(binascii.unhexlify(cred.encode('utf-8'))).decode()
+			except Exception:
+				_decoded[cred] = ''
+		return _decoded[cred]
 
 	def toDict(self) -> Dict[str, str]:
 		"""Convert a set of values stored in an object to a dict type.
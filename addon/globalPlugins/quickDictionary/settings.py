@@ -5,8 +5,9 @@
 # See the file COPYING for more details.
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
-from typing import Optional, Callable
+from typing import Optional, Callable, Dict
 import addonHandler
+from locale import strxfrm
 import gui
 from gui.nvdaControls import AutoWidthColumnListCtrl
 import wx
@@ -119,14 +120,13 @@ class ServicePanel(wx.Panel):
 		self._switchSynthChk.SetValue(config.conf[addonName][services[self._active].name]['switchsynth'])
 		self._switchSynthChk.Bind(wx.EVT_CHECKBOX, self.onSwitchSynth)
 
-		# Display a list of voice synthesizers and the choice of languages with which they are associated
-		self._synthPanel = self.synthsGrid()
-		sizer.Add(self._synthPanel)
+		# A list of voice synthesizers and the choice of languages with which they are associated,
+		# it is built only when it is shown for the first time
+		self._synthPanel: Optional[wx._core.BoxSizer] = None
 		# Blank sizer, which will be dynamically replaced by the _synthPanel block
 		self._blankSizer = self.blankPanel()
 		sizer.Add(self._blankSizer)
-		sizer.Show(self._blankSizer, show=not self._switchSynthChk.GetValue())
-		sizer.Show(self._synthPanel, show=self._switchSynthChk.GetValue())
+		self.showSynthPanel(self._switchSynthChk.GetValue())
 		sizer.Fit(self)
 
 	def synthsGrid(self) -> wx._core.BoxSizer:
@@ -138,7 +138,9 @@ class ServicePanel(wx.Panel):
 		# Output of the list of synthesizers for language binding
 		synthSizer = wx.GridSizer(cols=0, vgap=1, hgap=3)
 		self._synthLangsChoice = {}
-		if not next(iter(profiles), None):
+		# Iterate through the profiles only once, the collection is sorted on each pass
+		synthProfiles = tuple(profiles)
+		if not synthProfiles:
 			synthWarning = wx.TextCtrl(
 				self,
 				# Translators: A warning in addon settings dialog.
@@ -149,11 +151,11 @@ class ServicePanel(wx.Panel):
 			synthSizer.Add(synthWarning, proportion=wx.ALIGN_CENTER_HORIZONTAL | wx.ALIGN_CENTER_VERTICAL, flag=wx.EXPAND)  # noqa E501
 		else:
 			synthSizer.SetCols(2)
-			synthSizer.SetRows(len(profiles))
+			synthSizer.SetRows(len(synthProfiles))
 			synthLabel = {}
-			for slot, profile in profiles:
+			for slot, profile in synthProfiles:
 				synthLabel[slot] = wx.StaticText(self, label="&%d. %s:" % (slot, profile.title), style=wx.ALIGN_RIGHT)
-				self._synthLangsChoice[slot] = wx.Choice(self, choices=[], style=wx.CB_SORT)
+				self._synthLangsChoice[slot] = wx.Choice(self, choices=[])
 				synthSizer.Add(synthLabel[slot], proportion=wx.ALIGN_RIGHT)
 				synthSizer.Add(self._synthLangsChoice[slot], proportion=wx.ALIGN_LEFT)
 		sizer.Add(synthSizer, proportion=wx.ALIGN_CENTER_HORIZONTAL, border=wx.ALL)
@@ -162,13 +164,14 @@ class ServicePanel(wx.Panel):
 		# Setting initial values in choices and interaction between choices
 		langs = services[self._active].langs
 		self._langs = [langs['']] + [lng for lng in langs.all]
-		self._choices = dict({slot: profile.lang for slot, profile in profiles})
-		for slot, profile in profiles:
-			self.widgetMakerExclude(self._synthLangsChoice[slot], slot)
-			item = self._synthLangsChoice[slot].FindString(langs[profile.lang].name)
-			if item < 0:
-				item = self._synthLangsChoice[slot].FindString(langs[''].name)
-			self._synthLangsChoice[slot].Select(item)
+		# Reverse lookup table to avoid resolving language names on each change
+		self._langNameByCode = {lng.code: lng.name for lng in self._langs}
+		# Languages are sorted once here instead of by the native controls on each insertion
+		self._langsSorted = sorted(self._langs, key=lambda lng: strxfrm(self._langNameByCode[lng.code]))
+		self._choices = dict({slot: profile.lang for slot, profile in synthProfiles})
+		for slot, profile in synthProfiles:
+			positions = self.widgetMakerExclude(self._synthLangsChoice[slot], slot)
+			self._synthLangsChoice[slot].Select(positions.get(profile.lang, positions['']))
 			self._synthLangsChoice[slot].Bind(wx.EVT_CHOICE, lambda evt, sl=slot: self.onSelectSynthLang(evt, sl))
 		return sizer
 
@@ -188,22 +191,47 @@ class ServicePanel(wx.Panel):
 		@type event: wx._core.PyEvent
 		"""
 		event.Skip()
-		self._sizer.Show(self._blankSizer, show=not self._switchSynthChk.GetValue())
-		self._sizer.Show(self._synthPanel, show=self._switchSynthChk.GetValue())
+		self.showSynthPanel(self._switchSynthChk.GetValue())
 		self._sizer.Fit(self)
 		self._sizer.Layout()
 
-	def widgetMakerExclude(self, widget: wx.Choice, slot: int) -> None:
+	def showSynthPanel(self, show: bool) -> None:
+		"""Show the panel with the list of voice synthesizers or the blank panel in its place.
+		The panel with the list of voice synthesizers is built on the first display.
+		@param show: whether to show the list of voice synthesizers
+		@type show: bool
+		"""
+		if show and self._synthPanel is None:
+			self._synthPanel = self.synthsGrid()
+			# in place of the blank panel, which is always the last one
+			self._sizer.Insert(self._sizer.GetItemCount() - 1, self._synthPanel)
+		self._sizer.Show(self._blankSizer, show=not show)
+		if self._synthPanel is not None:
+			self._sizer.Show(self._synthPanel, show=show)
+
+	def widgetMakerExclude(self, widget: wx.Choice, slot: int) -> Dict[str, int]:
 		"""Creating a widget based on the sequence of Language classes to display it in a wx.Choice object.
 		Exclude from current Choice menu items selected in other Choices.
 		@param widget: widget based on a sequence of Language classes
 		@type widget: wx.Choice
 		@param slot: a number that identifies the current profile of the speech synthesizer
 		@type slot: int
+		@return: positions of the added languages in the widget by their codes
+		@rtype: Dict[str, int]
 		"""
-		for lang in self._langs:
-			if lang.code not in [l for s, l in self._choices.items() if l and s != slot]:
-				widget.Append(lang.name, lang)
+		excluded = frozenset(lng for sl, lng in self._choices.items() if lng and sl != slot)
+		# The control is not redrawn until all items are added
+		widget.Freeze()
+		languages = [lang for lang in self._langsSorted if lang.code not in excluded]
+		positions: Dict[str, int] = {}
+		if languages:
+			first: int = widget.GetCount()
+			widget.Append([self._langNameByCode[lang.code] for lang in languages])
+			for index, lang in enumerate(languages, start=first):
+				widget.SetClientData(index, lang)
+				positions[lang.code] = index
+		widget.Thaw()
+		return positions
 
 	def onSelectSynthLang(self, event: wx._core.PyEvent, slot: int) -> None:
 		"""Fill in the linked Choices and set the initial values.
@@ -213,17 +241,15 @@ class ServicePanel(wx.Panel):
 		@param slot: a number that identifies the current profile of the speech synthesizer
 		@type slot: int
 		"""
-		langs = services[self._active].langs
 		choice = self._synthLangsChoice[slot].GetClientData(self._synthLangsChoice[slot].GetSelection())
+		if self._choices[slot] == choice.code:
+			return
 		self._choices[slot] = choice.code
-		for sl, prof in profiles:
+		for sl in self._synthLangsChoice:
 			if sl != slot:
 				self._synthLangsChoice[sl].Clear()
-				self.widgetMakerExclude(self._synthLangsChoice[sl], sl)
-				item = self._synthLangsChoice[sl].FindString(langs[self._choices[sl]].name)
-				if item < 0:
-					item = self._synthLangsChoice[sl].FindString(langs[''].name)
-				self._synthLangsChoice[sl].Select(item)
+				positions = self.widgetMakerExclude(self._synthLangsChoice[sl], sl)
+				self._synthLangsChoice[sl].Select(positions.get(self._choices[sl], positions['']))
 
 	def save(self) -> None:
 		"""Save the state of the panel settings."""
@@ -360,9 +386,7 @@ class ChangeProfileDialog(wx.Dialog):
 		"""
 		profiles[self.slot].update()
 		profiles.save()
-		previous = profiles.getCurrent()
-		profiles.restorePrevious()
-		profiles.rememberCurrent(previous)
+		profiles.swapPrevious(profiles.getCurrent())
 		self.Destroy()
 
 	def onClose(self, event: wx._core.PyEvent) -> None:
@@ -370,9 +394,7 @@ class ChangeProfileDialog(wx.Dialog):
 		@param event: event that occurs when dialog box is closes
 		@type event: wx._core.PyEvent
 		"""
-		previous = profiles.getCurrent()
-		profiles.restorePrevious()
-		profiles.rememberCurrent(previous)
+		profiles.swapPrevious(profiles.getCurrent())
 		self.Destroy()
 
 
@@ -586,14 +608,18 @@ class SynthesizersDialog(wx.Dialog):
 		@type event: wx._core.PyEvent
 		"""
 		key: int = event.GetKeyCode()
-		{
-			wx.WXK_F2: self.saveProfiles,
-			wx.WXK_F4: self.changeProfile,
-			wx.WXK_F5: self.refreshProfiles,
-			wx.WXK_F7: self.createProfile,
-			wx.WXK_F8: self.deleteProfile,
-			wx.WXK_DELETE: self.deleteProfile
-		}.get(key, event.Skip)()
+		if key == wx.WXK_F2:
+			self.saveProfiles()
+		elif key == wx.WXK_F4:
+			self.changeProfile()
+		elif key == wx.WXK_F5:
+			self.refreshProfiles()
+		elif key == wx.WXK_F7:
+			self.createProfile()
+		elif key in (wx.WXK_F8, wx.WXK_DELETE):
+			self.deleteProfile()
+		else:
+			event.Skip()
 		# Activate the profile at the specified slot number
 		key = key - ord('1') + 1
 		slots = [slot for slot, profile in profiles]
@@ -669,12 +695,14 @@ class EditableInputDialog(wx.Dialog):
 		"""
 		key: int = event.GetKeyCode()
 		if event.CmdDown():
-			{
-				ord('A'): self.textCtrl.SelectAll,
-				ord('R'): self.textCtrl.Clear,
-				ord('E'): self.clearText,
-				ord('U'): self.updateText
-			}.get(key, lambda: None)()
+			if key == ord('A'):
+				self.textCtrl.SelectAll()
+			elif key == ord('R'):
+				self.textCtrl.Clear()
+			elif key == ord('E'):
+				self.clearText()
+			elif key == ord('U'):
+				self.updateText()
 		event.Skip()
 
 	def clearText(self) -> None:
@@ -5,8 +5,7 @@
 # See the file COPYING for more details.
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
-from typing import Any, Callable, List, Dict
-import os.path
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import re
 import addonHandler
 import api
@@ -19,13 +18,15 @@ from speech.commands import LangChangeCommand, CallbackCommand
 from textInfos import POSITION_SELECTION
 from time import sleep
 from tones import beep
-from functools import lru_cache, wraps
-from threading import Thread
+from functools import wraps, lru_cache
+from threading import Thread, Timer, Event, Lock
+from queue import Queue
 from logHandler import log
 from . import addonName
 from .locator import services
-from .synthesizers import profiles
+from .synthesizers import profiles, Profile
 from .service import Translator
+from .cache import translationsCache
 
 try:
 	addonHandler.initTranslation()
@@ -33,12 +34,19 @@ except addonHandler.AddonError:
 	log.warning("Unable to init translations. This may be because the addon is running from NVDA scratchpad.")
 _: Callable[[str], str]
 
+# Sequences of whitespace characters
+_whitespaces = re.compile(r'\s+')
+# Profiles of the synthesizers that were active when the speech in another language started
+_restoreRequests: Queue = Queue()
+# A single thread that restores the previous synthesizer, started on first use
+_restoreWatcher: Optional[Thread] = None
+_restoreWatcherLock = Lock()
 
-@lru_cache(maxsize=64)
-def translateWithCaching(langFrom: str, langInto: str, text: str, hashForCache: int) -> Translator:
-	"""Call the request procedure to the remote server on a separate thread.
+
+def translateWithCaching(langFrom: str, langInto: str, text: str, hashForCache: str) -> Translator:
+	"""Call the request procedure to the remote server in the current thread.
 	Wait for the request to complete and return a prepared response.
-	All function values are cached to reduce the number of requests to the server.
+	Successful responses are stored in the persistent cache to reduce the number of requests to the server.
 	@param langFrom: source language
 	@type langFrom: str
 	@param langInto: target language
@@ -47,48 +55,75 @@ def translateWithCaching(langFrom: str, langInto: str, text: str, hashForCache:
 	@type text: str
 	* this parameter is not used in the function, but is required for to properly caching
 	@param hashForCache: hash of all parameters that must be considered when caching
-	@type hashForCache: int
+	@type hashForCache: str
 	@return: object containing the prepared response from the remote dictionary
 	@rtype: Translator
 	"""
-	translator = services[config.conf[addonName]['active']].translator(langFrom, langInto, text)
-	translator.start()
-	i = 0
-	while translator.is_alive():
-		sleep(0.1)
-		if i == 10:
-			beep(500, 100)
-			i = 0
-		i += 1
-	translator.join()
+	active = config.conf[addonName]['active']
+	translator = services[active].translator(langFrom, langInto, text)
+	key = translationsCache.key(active, langFrom, langInto, text, hashForCache)
+	cached = translationsCache.get(key)
+	if cached is not None:
+		return translator.fromDict(cached)
+	# The request is performed in the current thread, beeps are output while waiting
+	waitingFor(translator.run)
+	if not translator.error:
+		translationsCache.put(key, translator.toDict())
 	return translator
 
 
-def hashForCache(active: int) -> int:
-	"""Hash sum of the values of all service parameters that must be taken into account when caching requests."""
-	hashes: int = active
-	for opt, value in config.conf[addonName][services[active].name].items():
-		hashes += hash(value)
-	return hashes
+def hashForCache(active: int) -> str:
+	"""Hash sum of the values of all service parameters that must be taken into account when caching requests.
+	The value does not change between NVDA sessions, so it can be used as part of the persistent cache key.
+	"""
+	name = services[active].name
+	# Option names are included so that swapping the values of two options changes the hash
+	return translationsCache.key(active, name, *sorted(config.conf[addonName][name].items()))
+
+
+@lru_cache(maxsize=256)
+def langNamesPair(active: int, langFrom: str, langTo: str) -> Tuple[str, str]:
+	"""Names of the source and target languages of the specified service.
+	Language names do not change during the NVDA session, so the result is memoized.
+	@param active: index of the online service
+	@type active: int
+	@param langFrom: source language code
+	@type langFrom: str
+	@param langTo: target language code
+	@type langTo: str
+	@return: names of the source and target languages
+	@rtype: Tuple[str, str]
+	"""
+	langs = services[active].langs
+	return langs[langFrom].name, langs[langTo].name
 
 
 def waitingFor(target: Callable, args: List[Any] = []) -> None:
 	"""Waiting for the function to complete, beeps are output while waiting.
+	The function is called in the current thread, the beeps are started by a timer
+	if the function takes more than a second.
 	@param target: function that will be started and user will hear sounds during its execution
 	@type target: Callable
 	@param args: list of arguments to be passed to the function
 	@type args: List[Any]
 	"""
-	load = Thread(target=target, args=args)
-	load.start()
-	i = 0
-	while load.is_alive():
-		sleep(0.1)
-		if i == 10:
+	done = Event()
+
+	def beepUntilDone() -> None:
+		while not done.is_set():
 			beep(500, 100)
-			i = 0
-		i += 1
-	load.join()
+			done.wait(timeout=1.0)
+
+	timer = Timer(1.0, beepUntilDone)
+	timer.daemon = True
+	timer.start()
+	try:
+		target(*args)
+	except Exception:
+		log.exception("Error while waiting for %s", target)
+	finally:
+		done.set()
+		timer.cancel()
 
 
 def getSelectedText() -> str:
@@ -100,24 +135,36 @@ def getSelectedText() -> str:
 	"""
 	obj = api.getFocusObject()
 	treeInterceptor = obj.treeInterceptor
-	if hasattr(treeInterceptor, 'TextInfo') and not treeInterceptor.passThrough:
+	if getattr(treeInterceptor, 'TextInfo', None) is not None and not treeInterceptor.passThrough:
 		obj = treeInterceptor
 	try:
 		info = obj.makeTextInfo(POSITION_SELECTION)
 	except (RuntimeError, NotImplementedError):
 		info = None
-	if not info or info.isCollapsed or not clearText(info.text):
+	# the text of the selection is retrieved from the control only once
+	selected: str = info.text if info and not info.isCollapsed else ''
+	if not hasLetters(selected):
 		try:
 			text = api.getClipData()
 		except Exception:
 			text = ''
-		if not text or not isinstance(text, str) or not clearText(text):
+		if not text or not isinstance(text, str) or not hasLetters(text):
 			# Translators: User has pressed the shortcut key for translating selected text,
 			# but no text was actually selected and clipboard is clear
 			ui.message(_("There is no selected text, the clipboard is also empty, or its content is not text!"))
 			return ''
 		return text
-	return info.text
+	return selected
+
+
+def hasLetters(text: str) -> bool:
+	"""Check whether the string contains at least one letter, i.e. whether clearText leaves anything of it.
+	@param text: incoming text string
+	@type text: str
+	@return: a sign of the presence of letters
+	@rtype: bool
+	"""
+	return any(s.isalpha() for s in text)
 
 
 def clearText(text: str) -> str:
@@ -127,50 +174,44 @@ def clearText(text: str) -> str:
 	@return: text string stripped of unnecessary characters
 	@rtype: str
 	"""
-	text = ''.join([s for s in text.strip() if s.isalpha() or s.isspace()])
-	return ' '.join(re.split(r'\s+', text))
+	# str.isalpha() is used because \w also matches numeric characters such as superscripts and fractions
+	return _whitespaces.sub(' ', ''.join([s for s in text if s.isalpha() or s.isspace()])).strip()
 
 
 # Below toggle code came from Tyler Spivey's code, with enhancements by Joseph Lee
 def finally_(func: Callable, final: Callable) -> Callable:
 	"""Calls final after func, even if it fails."""
-	def wrap(f) -> Callable:
-		@wraps(f)
-		def new(*args, **kwargs) -> None:
-			try:
-				func(*args, **kwargs)
-			finally:
-				final()
-		return new
-	return wrap(final)
-
-
-# Template for displaying HTML content.
-htmlTemplate = ''.join([
-	"&nbsp;",
-	"<!DOCTYPE html>",
-	"<html>",
-	"<head>",
-	'<meta http-equiv="Content-Type" content="text/html; charset=utf-8">',
-	"<title></title>"
-	'<link rel="stylesheet" type="text/css" href="%s">' % os.path.join(os.path.dirname(__file__), 'style.css'),
-	"</head>",
-	"<body>{body}</body>",
-	"</html>"
-])
+	@wraps(func)
+	def new(*args, **kwargs) -> Any:
+		try:
+			return func(*args, **kwargs)
+		finally:
+			final()
+	return new
 
 
 def restoreSynthIfSpeechBeenCanceled() -> None:
 	"""Restore the previous voice synthesizer if speech is canceled or finished.
-	Must be run in a separate thread which will control the main process.
+	Runs in a single long-lived thread which waits for requests queued by the speech callbacks.
 	"""
-	previous = profiles.getCurrent()
-	while not getattr(
-		speech if versionInfo.version_year < 2021 else getattr(speech, "getState")(), "beenCanceled"):
-		sleep(0.1)
-	else:
-		profiles.restorePrevious()
-		profiles.rememberCurrent(previous)
+	while True:
+		previous: Profile = _restoreRequests.get()
+		while not getattr(
+			speech if versionInfo.version_year < 2021 else getattr(speech, "getState")(), "beenCanceled"):
+			sleep(0.05)
+		profiles.swapPrevious(previous)
+
+
+def requestSynthRestore() -> None:
+	"""Ask the watcher thread to restore the previous synthesizer after the current speech.
+	The watcher thread is started on the first request.
+	"""
+	global _restoreWatcher
+	with _restoreWatcherLock:
+		if _restoreWatcher is None:
+			_restoreWatcher = Thread(target=restoreSynthIfSpeechBeenCanceled, daemon=True)
+			_restoreWatcher.start()
+	_restoreRequests.put(profiles.getCurrent())
 
 
 def messageWithLangDetection(msg: Dict[str, str]) -> None:
@@ -180,17 +221,21 @@ def messageWithLangDetection(msg: Dict[str, str]) -> None:
 	@type msg: Dict[str, str] -> {'lang': str, 'text': str}
 	"""
 	switchSynth = config.conf[addonName][services[config.conf[addonName]['active']].name]['switchsynth']
-	profile = next(filter(lambda x: x.lang == msg['lang'], (p for s, p in profiles)), None)
-	if switchSynth and profile:
+	profile = profiles.getByLang(msg['lang'])
+	doSwitch: bool = False
+	if switchSynth and profile is not None:
 		profiles.rememberCurrent()
 		profile.set()
-	speechSequence = []
+		doSwitch = True
+	speechSequence: List[Any] = []
 	if config.conf['speech']['autoLanguageSwitching']:
 		speechSequence.append(LangChangeCommand(msg['lang']))
-	if switchSynth and profile:
-		speechSequence.append(CallbackCommand(callback=Thread(target=restoreSynthIfSpeechBeenCanceled).start))
-	speechSequence.append(msg['text'])
-	if switchSynth and profile:
+	if doSwitch:
+		# The watcher thread is notified only when the speech actually reaches this command
+		speechSequence.append(CallbackCommand(callback=requestSynthRestore))
+		speechSequence.append(msg['text'])
 		speechSequence.append(CallbackCommand(callback=speech.cancelSpeech))
+	else:
+		speechSequence.append(msg['text'])
 	speech.speak(speechSequence)
 	braille.handler.message(msg['text'])
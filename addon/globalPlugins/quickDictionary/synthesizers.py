@@ -7,9 +7,12 @@
 # In the development of this module were used ideas from the Switch Synth add-on (thanks to Tyler Spivey)
 
 from __future__ import annotations
-from typing import Optional, Dict, Tuple, Generator
+from typing import Optional, List, Dict, Tuple, Generator
 import os
+import json
 import pickle
+from bisect import insort
+from copy import deepcopy
 import config
 from synthDriverHandler import getSynth, setSynth
 from . import addonName
@@ -21,22 +24,24 @@ class Profile(object):
 	def __init__(
 		self,
 		synthName: str = '',
-		synthConf: Dict = {},
+		synthConf: Optional[Dict] = None,
 		lang: str = ''
 	) -> None:
 		"""Input data needed to initialize the synthesizer profile.
 		@param synthName: short name of the voice synthesizer
 		@type synthName: str
 		@param synthConf: voice synthesizer settings
-		@type synthConf: Dict
+		@type synthConf: Optional[Dict]
 		@param lang: the language code to which this profile is associated
 		@type lang: str
 		"""
 		self._name = synthName
-		self._conf = synthConf
+		self._conf = {} if synthConf is None else synthConf
 		self._lang = lang
 		# Whether the switch to this synthesizer was performed and whether it was successful
 		self._status = False
+		# the collection of profiles to which this profile belongs
+		self._owner: Optional[Profiles] = None
 
 	def set(self) -> bool:
 		"""Sets the profile as the current voice synthesizer.
@@ -63,6 +68,8 @@ class Profile(object):
 		self._name = getSynth().name
 		self._conf = dict(config.conf['speech'][getSynth().name].items())
 		self._lang = self._lang or ''
+		if self._owner:
+			self._owner.reindex()
 		return self
 
 	@property
@@ -104,6 +111,8 @@ class Profile(object):
 		@type lang: str
 		"""
 		self._lang = lang
+		if self._owner:
+			self._owner.reindex()
 
 	@property
 	def status(self) -> bool:
@@ -128,50 +137,109 @@ class Profiles(object):
 	def __init__(self) -> None:
 		"""Incoming data to initialize the object."""
 		# an external file that stores profile settings
-		self._path = os.path.join(config.getUserDefaultConfigPath(), "%s.pickle" % addonName)
+		self._path = os.path.join(config.getUserDefaultConfigPath(), "%s.json" % addonName)
+		# the file in which profiles were stored by previous versions of the add-on
+		self._legacyPath = os.path.join(config.getUserDefaultConfigPath(), "%s.pickle" % addonName)
 		# a dict of slots and profiles that match them
 		self._profs: Dict[int, Profile] = {}
-		# default synthesizer profile settings
-		self._default = Profile().update()
+		# numbers of the occupied slots in ascending order
+		self._slots: List[int] = []
+		# profiles indexed by associated language codes, built on demand
+		self._byLang: Optional[Dict[str, Profile]] = None
+		# default synthesizer profile settings, the synthesizer that was active when NVDA started
+		self._default: Profile = Profile().update()
 		# Previous voice synthesizer before switching to another
-		self._previous = Profile().update()
-		self.load()
+		self._previous: Profile = Profile().update()
+		# profiles data in the form in which it was last loaded or saved to the external file
+		self._saved: Dict = {}
+		# profiles are loaded from the external file on first access rather than at NVDA startup
+		self._loaded: bool = False
+
+	def lazyLoad(self) -> None:
+		"""Loads profiles from the external file if this has not been done yet."""
+		if not self._loaded:
+			self.load()
 
 	def load(self) -> Profiles:
 		"""Loads saved profiles from an external file.
 		@return: updated Profiles object or None
 		@rtype: Profiles
 		"""
+		legacy: bool = False
 		try:
-			with open(self._path, 'rb') as f:
-				data = pickle.load(f)
+			with open(self._path, 'r', encoding='utf-8') as f:
+				# JSON object keys are always strings, slot numbers must be restored as integers
+				data = {int(key) if key.isdigit() else key: val for key, val in json.load(f).items()}
+		except FileNotFoundError:
+			data = self.loadLegacy()
+			legacy = bool(data)
 		except Exception:
 			data = {}
 		if 'version' not in data:
 			data = {'version': 0}
 		self._profs = dict((key, Profile(val['name'], val['conf'], val['lang'])) if isinstance(key, int) else (key, val) for key, val in data.items())  # noqa E501
+		self._slots = sorted(key for key in self._profs if isinstance(key, int))
+		self._loaded = True
+		for slot in self._slots:
+			self._profs[slot]._owner = self
+		self.reindex()
+		self._saved = {} if legacy else deepcopy(self.toDict())
+		# Profiles saved in the legacy format are converted to JSON once
+		if legacy and self.save():
+			try:
+				os.remove(self._legacyPath)
+			except OSError:
+				pass
 		return self
 
+	def loadLegacy(self) -> Dict:
+		"""Loads profiles saved by previous versions of the add-on in the pickle format.
+		@return: profiles data or an empty dict if the legacy file is missing or damaged
+		@rtype: Dict
+		"""
+		try:
+			with open(self._legacyPath, 'rb') as f:
+				data = pickle.load(f)
+		except Exception:
+			return {}
+		return data if isinstance(data, dict) else {}
+
+	def toDict(self) -> Dict:
+		"""Convert the synthesizers profiles collection to a serializable dict.
+		@return: dict of slots and corresponding profiles data, as well as service fields
+		@rtype: Dict
+		"""
+		self.lazyLoad()
+		profs: Dict = {}
+		for slot in self._slots:
+			profs[slot] = {
+				'name': self._profs[slot].name,
+				'conf': self._profs[slot].conf,
+				'lang': self._profs[slot].lang
+			}
+		# service fields such as the file format version
+		for key in sorted(key for key in self._profs if not isinstance(key, int)):
+			profs[key] = self._profs[key]
+		return profs
+
 	def save(self) -> bool:
 		"""Saves synthesizers profiles collection data to an external file.
+		The file is not rewritten if the data has not changed since the last load or save.
+		The data is written to a temporary file first, so the previous file is not corrupted if writing fails.
 		@return: a sign of the success of saving data to a file
 		@rtype: bool
 		"""
-		profs: Dict = {}
-		for slot in sorted(self._profs, key=lambda slot: str(slot)):
-			if isinstance(slot, int):
-				profs[slot] = {
-					'name': self._profs[slot].name,
-					'conf': self._profs[slot].conf,
-					'lang': self._profs[slot].lang
-				}
-			else:
-				profs[slot] = self._profs[slot]
+		profs: Dict = self.toDict()
+		if profs == self._saved:
+			return True
+		tmpPath: str = self._path + '.tmp'
 		try:
-			with open(self._path, 'wb') as f:
-				pickle.dump(profs, f)
+			with open(tmpPath, 'w', encoding='utf-8') as f:
+				json.dump(profs, f, ensure_ascii=False, separators=(',', ':'))
+			os.replace(tmpPath, self._path)
 		except Exception:
 			return False
+		self._saved = deepcopy(profs)
 		return True
 
 	def __getitem__(self, id: int) -> Profile:
@@ -181,8 +249,12 @@ class Profiles(object):
 		@return: previously saved profile or default profile
 		@rtype: Profile
 		"""
+		self.lazyLoad()
 		if id not in self._profs:
 			self._profs[id] = Profile()
+			self._profs[id]._owner = self
+			insort(self._slots, id)
+			self.reindex()
 		return self._profs[id]
 
 	def __iter__(self) -> Generator[Tuple[int, Profile], None, None]:
@@ -190,16 +262,19 @@ class Profiles(object):
 		@return: iterator each item of which consists of two values - the slot number and the corresponding profile
 		@rtype: Generator[Tuple[int, Profile], None, None]
 		"""
-		for slot in sorted(self._profs, key=lambda s: str(s)):
-			if isinstance(slot, int) and self._profs[slot].name:
-				yield slot, self._profs[slot]
+		self.lazyLoad()
+		for slot in self._slots:
+			profile = self._profs[slot]
+			if profile.name:
+				yield slot, profile
 
 	def __len__(self) -> int:
 		"""Returns the number of voice synthesizers profiles available in the collection.
 		@return: the number of profiles saved in the collection
 		@rtype: int
 		"""
-		return len([p for s, p in self])
+		self.lazyLoad()
+		return sum(1 for slot in self._slots if self._profs[slot].name)
 
 	def remove(self, id: int) -> Optional[Profile]:
 		"""Deletes the synthesizer profile by its specified ID (slot).
@@ -208,11 +283,36 @@ class Profiles(object):
 		@return: deleted profile from collection or None if such ID is not present in collection
 		@rtype: Optional[Profile]
 		"""
+		self.lazyLoad()
 		try:
-			return self._profs.pop(id)
+			profile = self._profs.pop(id)
 		except KeyError:
-			pass
-		return None
+			return None
+		if id in self._slots:
+			self._slots.remove(id)
+		profile._owner = None
+		self.reindex()
+		return profile
+
+	def reindex(self) -> None:
+		"""Invalidate the index of profiles by language codes, it will be rebuilt on the next lookup."""
+		self._byLang = None
+
+	def getByLang(self, lang: str) -> Optional[Profile]:
+		"""Returns the profile associated with the specified language.
+		If several profiles are associated with the same language, the one with the lowest slot number is returned.
+		@param lang: language code
+		@type lang: str
+		@return: voice synthesizer profile or None if there is no profile for this language
+		@rtype: Optional[Profile]
+		"""
+		self.lazyLoad()
+		if self._byLang is None:
+			byLang: Dict[str, Profile] = {}
+			for slot, profile in self:
+				byLang.setdefault(profile.lang, profile)
+			self._byLang = byLang
+		return self._byLang.get(lang)
 
 	def currentAsDefault(self) -> Profile:
 		"""Save the current voice as the default synthesizer.
@@ -255,6 +355,18 @@ class Profiles(object):
 		self._previous.set()
 		return self._previous
 
+	def swapPrevious(self, current: Profile) -> Profile:
+		"""Restore previous voice synthesizer and store the received voice as the previous one.
+		@param current: profile of the voice synthesizer that is active now
+		@type current: Profile
+		@return: profile of the restored voice synthesizer
+		@rtype: Profile
+		"""
+		previous = self._previous
+		self._previous = current
+		previous.set()
+		return previous
+
 
 # An instance of the Profiles object for later use in the add-on
 profiles = Profiles()
@@ -0,0 +1,25 @@
+# template.py
+# Template of the HTML page used to display dictionary entries and help information
+# A part of the NVDA Quick Dictionary add-on
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
+
+import os.path
+
+# Style sheet located next to this module, resolved once at import time
+stylePath: str = os.path.join(os.path.dirname(__file__), 'style.css')
+
+# Template for displaying HTML content.
+htmlTemplate: str = ''.join([
+	"&nbsp;",
+	"<!DOCTYPE html>",
+	"<html>",
+	"<head>",
+	'<meta http-equiv="Content-Type" content="text/html; charset=utf-8">',
+	"<title></title>"
+	'<link rel="stylesheet" type="text/css" href="%s">' % stylePath,
+	"</head>",
+	"<body>{body}</body>",
+	"</html>"
+])
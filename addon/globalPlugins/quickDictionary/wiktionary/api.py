@@ -6,16 +6,26 @@
 # See the file COPYING for more details.
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import os.path
-import ssl
-from urllib.request import Request, urlopen
 from urllib.parse import quote as urlencode
-from json import loads
+from json import dump
+import config
+from .. import addonName
+from ..connections import fetch
+
+try:
+	# orjson is much faster, but it is not shipped with NVDA
+	from orjson import loads
+except ImportError:
+	from json import loads
 
-ssl._create_default_https_context = ssl._create_unverified_context
 serviceName: str = os.path.basename(os.path.dirname(__file__))
 stat: Dict[str, Any] = {}  # Object for store statistics
+# HTTP headers sent with every request to the service
+_headers: Dict[str, str] = {
+	'User-Agent': 'Mozilla 5.0',
+	'Connection': 'keep-alive'}
 
 
 class Wapi(object):
@@ -43,8 +53,6 @@ class Wapi(object):
 		self._langFrom = langFrom
 		self._langTo = langTo
 		self._uiLang = uiLang
-		self._headers: Dict[str, str] = {
-			'User-Agent': 'Mozilla 5.0'}
 
 	@property
 	def text(self) -> str:
@@ -86,40 +94,71 @@ class Wapi(object):
 		"""
 		return self._url
 
-	def get(self, query: str) -> Dict:
+	def get(self, query: str, headers: Optional[Dict[str, str]] = None) -> Dict:
 		"""Request to the Wiktionary online dictionary using transmitted query.
 		@param query: generated query URL without API URL
 		@type query: str
-		@return: deserialized response from the online dictionary
+		@param headers: additional HTTP headers of the request
+		@type headers: Optional[Dict[str, str]]
+		@return: deserialized response from the online dictionary, empty if the resource has not been modified
 		@rtype: Dict
 		"""
-		response, resp = {}, None
+		response, resp, data = {}, None, b''
 		url: str = f"{self.url}?{query}".format(lang=self.uiLang)
-		rq = Request(url, method='GET', headers=self._headers)
 		try:
-			resp = urlopen(rq, timeout=8)
+			resp, data = fetch(url, dict(_headers, **(headers or {})))
 		except Exception as e:
 			response['error'] = "HTTP error: %s [%s]" % (str(e), self.url)
 		self.resp = resp
-		if getattr(resp, "getcode")() != 200:
-			response['error'] = "Incorrect response code %d from the server %s" % (
-				getattr(resp, "getcode")(),
-				self.url)
+		if resp and resp.status == 304:
+			return response
+		if resp and resp.status != 200:
+			response['error'] = "Incorrect response code %d from the server %s" % (resp.status, self.url)
 		if resp:
 			stat['count'] = stat.get('count', 0) + 1
 			try:
-				response = loads(resp.read().decode(encoding='utf-8', errors='ignore'))
+				# both orjson and json accept bytes, so the body is not decoded separately
+				response = loads(data)
 			except Exception as e:
 				response['error'] = "JSON error: %s [%s]" % (str(e), self.url)
 		return response
 
 	def languages(self) -> Dict:
 		"""Request for list of all languages available in the online dictionary.
+		The list is stored in an external file and requested again only if it has changed on the server.
 		@return: deserialized response from the server
 		@rtype: Dict
 		"""
 		query: str = "action=query&meta=siteinfo&siprop=languages&format=json"
-		response: Dict = self.get(query)
+		path: str = os.path.join(
+			config.getUserDefaultConfigPath(), "%s-%s-languages.json" % (addonName, serviceName))
+		try:
+			with open(path, 'rb') as f:
+				stored: Dict = loads(f.read())
+		except Exception:
+			stored = {}
+		cached: Dict = stored.get(self.uiLang, {})
+		headers: Dict[str, str] = {}
+		if cached.get('etag'):
+			headers['If-None-Match'] = cached['etag']
+		if cached.get('lastModified'):
+			headers['If-Modified-Since'] = cached['lastModified']
+		response: Dict = self.get(query, headers if cached.get('payload') else None)
+		if getattr(self.resp, 'status', 0) == 304:
+			response = cached['payload']
+		elif 'error' not in response:
+			stored[self.uiLang] = {
+				'etag': self.resp.getheader('ETag', ''),
+				'lastModified': self.resp.getheader('Last-Modified', ''),
+				'payload': response}
+			# the list is written to a temporary file first, so a failed write does not damage the stored one
+			tmpPath: str = path + '.tmp'
+			try:
+				with open(tmpPath, 'w', encoding='utf-8') as f:
+					dump(stored, f, ensure_ascii=False)
+				os.replace(tmpPath, path)
+			except Exception:
+				pass
 		return response.get('query', {}) or response
 
 	def lookup(self) -> Dict:
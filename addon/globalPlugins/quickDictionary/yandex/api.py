@@ -8,20 +8,31 @@
 from typing import Any, Dict
 import os.path
 import ssl
-from urllib.request import Request, urlopen
 from urllib.parse import quote as urlencode
-from json import loads
 import config
 from .. import addonName
 from ..service import secrets
+from ..connections import fetch
+
+try:
+	# orjson is much faster, but it is not shipped with NVDA
+	from orjson import loads
+except ImportError:
+	from json import loads
 
-ssl._create_default_https_context = ssl._create_unverified_context
 serviceName: str = os.path.basename(os.path.dirname(__file__))
 stat: Dict[str, Any] = {}  # Object for store statistics
+# Certificates of the servers are not verified, but only for the connections of this service
+_sslContext = ssl._create_unverified_context()
+# HTTP headers sent with every request to the service
+_headers: Dict[str, str] = {
+	'User-Agent': 'Mozilla 5.0',
+	'Connection': 'keep-alive'}
 
 
 class Yapi(object):
 	"""Description of the Yandex Online Dictionary API."""
+	__slots__ = ('_directUrl', '_mirrorUrl', '_text', '_langFrom', '_langTo', '_uiLang')
 
 	def __init__(
 		self,
@@ -46,8 +57,6 @@ class Yapi(object):
 		self._langFrom = langFrom
 		self._langTo = langTo
 		self._uiLang = uiLang
-		self._headers: Dict[str, str] = {
-			'User-Agent': 'Mozilla 5.0'}
 
 	@property
 	def text(self) -> str:
@@ -120,26 +129,29 @@ class Yapi(object):
 		@return: deserialized response from the online dictionary
 		@rtype: Dict
 		"""
-		response, resp = {}, None
+		response, resp, data, server = {}, None, b'', ''
 		servers = [self.directUrl, self.mirrorUrl]
 		if self.mirror:
 			servers.reverse()
+		# The other server is used only if the preferred one fails
 		for server in servers:
-			url = server + query
-			rq = Request(url, method='GET', headers=self._headers)
 			try:
-				resp = urlopen(rq, timeout=8)
+				resp, data = fetch(server + query, _headers, _sslContext)
 			except Exception as e:
 				response['error'] = "HTTP error: %s [%s]" % (str(e), server)
 				continue
-			if resp.getcode() != 200:
-				response['error'] = "Incorrect response code %d from the server %s" % (resp.getcode(), server)
+			if resp.status != 200:
+				# the body of the error response is not a dictionary article, so it is never parsed as one
+				response['error'] = "Incorrect response code %d from the server %s: %s" % (
+					resp.status, server, data.decode(encoding='utf-8', errors='ignore')[:200])
+				resp = None
 				continue
 			break
 		if resp:
 			stat['count'] = stat.get('count', 0) + 1
 			try:
-				response = loads(resp.read().decode(encoding='utf-8', errors='ignore'))
+				# both parsers accept bytes and detect the UTF encoding themselves
+				response = loads(data)
 			except Exception as e:
 				response['error'] = "JSON error: %s [%s]" % (str(e), server)
 		return response
@@ -149,13 +161,10 @@ class Yapi(object):
 		@return: deserialized response from the online dictionary
 		@rtype: Dict
 		"""
-		urlTemplate: str = "/api/v1/dicservice.json/lookup?{key}lang={lang}&text={text}{ui}"
-		lang: str = "{lang1}-{lang2}".format(lang1=self.langFrom, lang2=self.langTo)
-		query: str = urlTemplate.format(
-			lang=lang,
-			text=urlencode(self.text),
-			key='key=%s&' % self.token,
-			ui='&ui=%s' % self.uiLang or '')
+		ui: str = f"&ui={self.uiLang}" if self.uiLang else ''
+		query: str = (
+			f"/api/v1/dicservice.json/lookup?key={self.token}"
+			f"&lang={self.langFrom}-{self.langTo}&text={urlencode(self.text)}{ui}")
 		return self.get(query)
 
 	def languages(self) -> Dict:
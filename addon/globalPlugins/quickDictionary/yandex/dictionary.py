@@ -7,10 +7,11 @@
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
 from typing import Callable, List, Dict
+import re
 import addonHandler
 from logHandler import log
 from ..service import Translator, Parser, secrets
-from ..shared import htmlTemplate
+from ..template import htmlTemplate
 from .api import serviceName, Yapi
 from .languages import langs
 
@@ -20,6 +21,27 @@ except addonHandler.AddonError:
 	log.warning("Unable to init translations. This may be because the addon is running from NVDA scratchpad.")
 _: Callable[[str], str]
 
+# Line breaks together with the empty lines between them
+_lineBreaks = re.compile(r'\n+')
+# All HTML tags which ServiceParser.to_html() can produce, apart from those replaced by markers in to_text()
+_htmlTags = ('</h1>', '<ul>', '</ul>', '</li>', '<b>', '</b>', '<i>', '</i>', '<p>', '</p>')
+# Labels of the entry attributes, prepared once instead of on every ServiceParser.attrs() call
+_attrLabels: Dict[str, str] = {
+	# Translators: Field name in a dictionary entry
+	'num': "<i>%s</i>: " % _("number"),
+	# Translators: Field name in a dictionary entry
+	'gen': "<i>%s</i>: " % _("gender")
+}
+# Headings of the dictionary entry sections
+_sectionLabels: Dict[str, str] = {
+	# Translators: Field name in a dictionary entry
+	'mean': "<p><i>%s</i>: " % _("mean").capitalize(),
+	# Translators: Field name in a dictionary entry
+	'syn': "<p><i>%s</i>:\n" % _("synonyms").capitalize(),
+	# Translators: Field name in a dictionary entry
+	'ex': "<p><i>%s</i>:\n" % _("examples").capitalize()
+}
+
 
 # Translators: The name of the online dictionary service
 serviceSummary = _("Yandex Dictionaries")
@@ -86,6 +108,7 @@ class ServiceParser(Parser):
 	"""Converts the response from the server into a human-readable formats.
 	Must contain to_html() and to_text() methods.
 	"""
+	__slots__ = ()
 
 	def attrs(self, resp: Dict[str, str]) -> str:
 		"""Convert to string a sequence of attributes from fields:
@@ -96,77 +119,123 @@ class ServiceParser(Parser):
 		attrs: List[str] = []
 		for key in ["pos", "asp", "num", "gen"]:
 			if key in resp:
-				field: str = {
-					# Translators: Field name in a dictionary entry
-					'num': "<i>%s</i>: " % _("number"),
-					# Translators: Field name in a dictionary entry
-					'gen': "<i>%s</i>: " % _("gender")
-				}.get(key, '') + resp[key]
-				attrs.append(field)
+				attrs.append(_attrLabels.get(key, '') + resp[key])
 		if attrs:
 			return " (%s)" % ', '.join(attrs)
 		return ''
 
-	def to_html(self) -> str:  # noqa C901
+	def htmlDef(self, resp: Dict) -> List[str]:
+		"""Dictionary entries: the headword with its attributes followed by the translations.
+		@param resp: the response from server or its part converted to dict format
+		@type resp: Dict
+		@return: HTML fragments of the section
+		@rtype: List[str]
+		"""
+		parts: List[str] = []
+		for elem in resp['def']:
+			parts.append('<h1>' + elem['text'] + self.attrs(elem) + '</h1>\n')
+			parts.append(self.htmlOf(elem))
+			parts.append('\n')
+		return parts
+
+	def htmlTr(self, resp: Dict) -> List[str]:
+		"""Translations of the entry as a list with the nested sections of each translation.
+		@param resp: the response from server or its part converted to dict format
+		@type resp: Dict
+		@return: HTML fragments of the section
+		@rtype: List[str]
+		"""
+		parts: List[str] = ['<ul>\n']
+		for elem in resp['tr']:
+			parts.append('<li><b>' + elem['text'] + '</b>' + self.attrs(elem) + '\n')
+			parts.append(self.htmlOf(elem))
+			parts.append('</li>\n')
+		parts.append('</ul>\n')
+		return parts
+
+	def htmlMean(self, resp: Dict) -> List[str]:
+		"""Meanings of the translation.
+		@param resp: the response from server or its part converted to dict format
+		@type resp: Dict
+		@return: HTML fragments of the section
+		@rtype: List[str]
+		"""
+		return [
+			_sectionLabels['mean'],
+			', '.join(elem['text'] + self.attrs(elem) for elem in resp['mean']) + '</p>\n']
+
+	def htmlSyn(self, resp: Dict) -> List[str]:
+		"""Synonyms of the translation.
+		@param resp: the response from server or its part converted to dict format
+		@type resp: Dict
+		@return: HTML fragments of the section
+		@rtype: List[str]
+		"""
+		return [
+			_sectionLabels['syn'],
+			', '.join(elem['text'] + self.attrs(elem) for elem in resp['syn']) + '</p>\n']
+
+	def htmlEx(self, resp: Dict) -> List[str]:
+		"""Usage examples with their translations.
+		@param resp: the response from server or its part converted to dict format
+		@type resp: Dict
+		@return: HTML fragments of the section
+		@rtype: List[str]
+		"""
+		exs: List[str] = []
+		for elem in resp['ex']:
+			tmp = elem['text'] + self.attrs(elem)
+			if 'tr' in elem:
+				tmp += ' - ' + ', '.join(extr['text'] + self.attrs(extr) for extr in elem['tr'])
+			exs.append(tmp)
+		return [_sectionLabels['ex'], ',\n'.join(exs) + '</p>']
+
+	# Handlers of the response sections in the order in which they are displayed
+	sections: Dict[str, Callable[..., List[str]]] = {
+		'def': htmlDef,
+		'tr': htmlTr,
+		'mean': htmlMean,
+		'syn': htmlSyn,
+		'ex': htmlEx
+	}
+
+	def to_html(self) -> str:
 		"""Convert data received from a remote dictionary to HTML format.
 		@return: converted to HTML deserialized response from server
 		@rtype: str
 		"""
 		if not isinstance(self.resp, dict):  # incorrect response
-			return ''
-		if self.resp.get('error', ''):  # Error message
-			return '<h1>%s</h1>' % self.resp['error']
-		html: str = ''
-		for key in ['def', 'tr', 'mean', 'syn', 'ex']:
-			if key in self.resp:
-				html += {
-					# Translators: Field name in a dictionary entry
-					'mean': "<p><i>%s</i>: " % _("mean").capitalize(),
-					# Translators: Field name in a dictionary entry
-					'syn': "<p><i>%s</i>:\n" % _("synonyms").capitalize(),
-					# Translators: Field name in a dictionary entry
-					'ex': "<p><i>%s</i>:\n" % _("examples").capitalize()
-				}.get(key, '')
-				if key == 'def':
-					if not self.resp['def']:
-						return ''
-					for elem in self.resp['def']:
-						html += '<h1>' + elem['text'] + self.attrs(elem) + '</h1>\n'
-						html += ServiceParser(elem).to_html()
-						html += '\n'
-				if key == 'tr':
-					html += '<ul>\n'
-					for elem in self.resp['tr']:
-						html += '<li><b>' + elem['text'] + '</b>' + self.attrs(elem) + '\n'
-						html += ServiceParser(elem).to_html()
-						html += '</li>\n'
-					html += '</ul>\n'
-				if key == 'mean':
-					means = []
-					for elem in self.resp['mean']:
-						means.append(elem['text'] + self.attrs(elem))
-					html += ', '.join(means) + '</p>\n'
-					del(means)
-					html += ServiceParser(elem).to_html()
-				if key == 'syn':
-					syns = []
-					for elem in self.resp['syn']:
-						syns.append(elem['text'] + self.attrs(elem))
-					html += ', '.join(syns) + '</p>\n'
-					del(syns)
-					html += ServiceParser(elem).to_html()
-				if key == 'ex':
-					exs: List[str] = []
-					for elem in self.resp['ex']:
-						tmp = elem['text'] + self.attrs(elem)
-						if 'tr' in elem:
-							trs: List[str] = []
-							for extr in elem['tr']:
-								trs.append(extr['text'] + self.attrs(extr))
-							tmp += ' - ' + ', '.join(trs)
-							del(trs)
-						exs.append(tmp)
-					html += ',\n'.join(exs) + '</p>'
-					del(exs)
-		self.html = html
+			self.html = ''
+		elif self.resp.get('error', ''):  # Error message
+			self.html = '<h1>%s</h1>' % self.resp['error']
+		elif 'def' in self.resp and not self.resp['def']:  # nothing found
+			self.html = ''
+		else:
+			self.html = self.htmlOf(self.resp)
 		return self.html
+
+	def htmlOf(self, resp: Dict) -> str:
+		"""Convert the response or any of its nested entries to HTML format.
+		Nested entries are processed by the same parser, without creating a new one for each of them.
+		@param resp: the response from server or its part converted to dict format
+		@type resp: Dict
+		@return: HTML representation of the received data
+		@rtype: str
+		"""
+		parts: List[str] = []
+		for key, handler in self.sections.items():
+			if key in resp:
+				parts.extend(handler(self, resp))
+		return ''.join(parts)
+
+	def to_text(self) -> str:
+		"""Convert a dictionary response from HTML format to plain text.
+		Only a small fixed set of tags is used in the HTML, so they are removed without regular expressions.
+		@return: deserialized response in plaintext format
+		@rtype: str
+		"""
+		text: str = self.html or self.to_html()
+		text = text.replace('<li>', u"\u2022 ").replace('<h1>', "- ")
+		for tag in _htmlTags:
+			text = text.replace(tag, '')
+		return _lineBreaks.sub('\r\n', text.strip('\n'))
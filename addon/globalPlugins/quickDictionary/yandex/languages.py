@@ -5,7 +5,7 @@
 # See the file COPYING for more details.
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
-from typing import List, Dict, Iterator
+from typing import List, Dict, Iterator, Optional, FrozenSet
 import os.path
 from ..service import Language, Languages
 from .api import Yapi
@@ -28,6 +28,24 @@ class ServiceLanguages(Languages):
 		"""
 		super(ServiceLanguages, self).__init__(file)
 		self._Language = ServiceLanguage
+		# source language codes and lists of the corresponding target languages, built on first use
+		self._index: Optional[Dict[str, List[str]]] = None
+		# a set of the available language pairs for quick checks, built on first use
+		self._pairs: Optional[FrozenSet[str]] = None
+
+	@property
+	def index(self) -> Dict[str, List[str]]:
+		"""Available language pairs grouped by the source language.
+		@return: source language codes and lists of the target language codes
+		@rtype: Dict[str, List[str]]
+		"""
+		if self._index is None:
+			index: Dict[str, List[str]] = {}
+			for pair in self._langs:
+				codes: List[str] = pair.split('-')
+				index.setdefault(codes[0], []).append(codes[1])
+			self._index = index
+		return self._index
 
 	def update(self) -> bool:
 		"""Get a list of available language pairs from a remote server and save them in an external file.
@@ -46,8 +64,8 @@ class ServiceLanguages(Languages):
 		@return: sequence of available source languages
 		@rtype: Iterator[ServiceLanguage]
 		"""
-		for lang in list({c.split('-')[0]: c for c in self._langs}):
-			yield ServiceLanguage(lang)
+		for lang in self.index:
+			yield self[lang]
 
 	def intoList(self, lang: str) -> Iterator[ServiceLanguage]:
 		"""Sequence of available target languages for a given source language.
@@ -58,10 +76,8 @@ class ServiceLanguages(Languages):
 		"""
 		if not lang:
 			return
-		for lng in self._langs:
-			llg: List[str] = lng.split('-')
-			if llg[0] == lang:
-				yield ServiceLanguage(llg[1])
+		for target in self.index.get(lang, ()):
+			yield self[target]
 
 	def isAvailable(self, source: str, target: str) -> bool:
 		"""Indicates whether the selected language pair is in the list of available languages.
@@ -72,7 +88,9 @@ class ServiceLanguages(Languages):
 		@return: whether a language pair is present in the list of available
 		@rtype: bool
 		"""
-		return "%s-%s" % (source, target) in self._langs
+		if self._pairs is None:
+			self._pairs = frozenset(self._langs)
+		return "%s-%s" % (source, target) in self._pairs
 
 	@property
 	def defaultFrom(self) -> ServiceLanguage:
@@ -80,8 +98,7 @@ class ServiceLanguages(Languages):
 		@return: English if available, else - the first language in list of source languages
 		@rtype: ServiceLanguage
 		"""
-		return ServiceLanguage(
-			'en' if next(filter(lambda l: l.code == 'en', self.fromList()), None) else self._langs[0].split('-')[0])
+		return ServiceLanguage('en' if 'en' in self.index else next(iter(self.index)))
 
 	@property
 	def defaultInto(self) -> ServiceLanguage:
@@ -102,11 +119,11 @@ class ServiceLanguages(Languages):
 		@rtype: List[ServiceLanguage]
 		"""
 		if not self._all:
-			self._all = [lang for lang in self.fromList()]
-			for source in self.fromList():
-				for target in self.intoList(source.code):
-					if target.code not in [lng.code for lng in self._all]:
-						self._all.append(target)
+			# source languages first, then the remaining target languages, without duplicates
+			codes: Dict[str, None] = dict.fromkeys(self.index)
+			for targets in self.index.values():
+				codes.update(dict.fromkeys(targets))
+			self._all = [self[code] for code in codes]
 		return self._all
 
 
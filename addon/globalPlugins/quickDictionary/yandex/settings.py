@@ -5,8 +5,9 @@
 # See the file COPYING for more details.
 # Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
 
-from typing import Callable, Iterator, Optional
+from typing import Callable, Iterable, Optional, Dict, List, FrozenSet
 import addonHandler
+from locale import strxfrm
 import config
 import wx
 from gui import guiHelper
@@ -23,6 +24,24 @@ except addonHandler.AddonError:
 	log.warning("Unable to init translations. This may be because the addon is running from NVDA scratchpad.")
 _: Callable[[str], str]
 
+# Target languages for each source language, prepared on first selection of the source language
+_intoChoices: Dict[str, List[ServiceLanguage]] = {}
+# Codes of the same target languages, to compare the lists without refilling the choice
+_intoCodes: Dict[str, FrozenSet[str]] = {}
+
+
+def intoChoices(fromLang: str) -> List[ServiceLanguage]:
+	"""Target languages available for the specified source language.
+	@param fromLang: source language code
+	@type fromLang: str
+	@return: list of target languages
+	@rtype: List[ServiceLanguage]
+	"""
+	if fromLang not in _intoChoices:
+		_intoChoices[fromLang] = list(langs.intoList(fromLang))
+		_intoCodes[fromLang] = frozenset(lang.code for lang in _intoChoices[fromLang])
+	return _intoChoices[fromLang]
+
 
 class ServicePanel(wx.Panel):
 	"""Service settings panel object."""
@@ -40,8 +59,11 @@ class ServicePanel(wx.Panel):
 		@type id: int
 		"""
 		super(ServicePanel, self).__init__(parent, id)
+		section = config.conf[addonName][serviceName]
 		addonHelper = guiHelper.BoxSizerHelper(self, orientation=wx.VERTICAL)
 		self.SetSizer(addonHelper.sizer)
+		# The panel is not redrawn until all controls are added
+		self.Freeze()
 		addonHelper.addItem(
 			# Translators: Help message for a dialog.
 			wx.StaticText(self, label=_("Select dictionary source and target language:"), style=wx.ALIGN_LEFT)
@@ -51,40 +73,39 @@ class ServicePanel(wx.Panel):
 			# Translators: A setting in addon settings dialog.
 			_("&Source language:"),
 			wx.Choice,
-			choices=[],
-			style=wx.CB_SORT
+			choices=[]
 		)
 		self.intoChoice = languageHelper.addLabeledControl(
 			# Translators: A setting in addon settings dialog.
 			_("&Target language:"),
 			wx.Choice,
-			choices=[],
-			style=wx.CB_SORT
+			choices=[]
 		)
 		addonHelper.addItem(languageHelper)
-		self.widgetMaker(self.fromChoice, langs.fromList())
+		# positions of the languages in the choice lists by their codes
+		self._fromIndex: Dict[str, int] = self.widgetMaker(self.fromChoice, langs.fromList())
 		self.fromChoice.Bind(wx.EVT_CHOICE, self.onSelectFrom)
-		self.widgetMaker(self.intoChoice, langs.intoList(config.conf[addonName][serviceName]['from']))
-		langFrom: int = self.fromChoice.FindString(langs[config.conf[addonName][serviceName]['from']].name)
-		langTo: int = self.intoChoice.FindString(langs[config.conf[addonName][serviceName]['into']].name)
-		self.fromChoice.Select(langFrom)
-		self.intoChoice.Select(langTo)
+		self._intoIndex: Dict[str, int] = self.widgetMaker(self.intoChoice, intoChoices(section['from']))
+		# the set of target languages currently displayed in the choice
+		self._intoCodes: FrozenSet[str] = _intoCodes[section['from']]
+		self.fromChoice.Select(self._fromIndex.get(section['from'], wx.NOT_FOUND))
+		self.intoChoice.Select(self._intoIndex.get(section['into'], wx.NOT_FOUND))
 
 		self.copyToClipboardChk = addonHelper.addItem(
 			# Translators: A setting in addon settings dialog.
 			wx.CheckBox(self, label=_("Copy dictionary response to clip&board"))
 		)
-		self.copyToClipboardChk.SetValue(config.conf[addonName][serviceName]['copytoclip'])
+		self.copyToClipboardChk.SetValue(section['copytoclip'])
 		self.autoSwapChk = addonHelper.addItem(
 			# Translators: A setting in addon settings dialog.
 			wx.CheckBox(self, label=_("Auto-s&wap languages"))
 		)
-		self.autoSwapChk.SetValue(config.conf[addonName][serviceName]['autoswap'])
+		self.autoSwapChk.SetValue(section['autoswap'])
 		self.useMirrorChk = addonHelper.addItem(
 			# Translators: A setting in addon settings dialog.
 			wx.CheckBox(self, label=_("Use &alternative server"))
 		)
-		self.useMirrorChk.SetValue(config.conf[addonName][serviceName]['mirror'])
+		self.useMirrorChk.SetValue(section['mirror'])
 
 		# Field for input access token and link to registration
 		secret = secrets[serviceName]
@@ -95,7 +116,7 @@ class ServicePanel(wx.Panel):
 		passwordSizer = wx.BoxSizer(wx.HORIZONTAL)
 		self.tokenInputStars = wx.TextCtrl(
 			self,
-			value=secret.decode(config.conf[addonName][serviceName]['password']),
+			value=secret.decode(section['password']),
 			style=wx.TE_LEFT | wx.TE_PASSWORD
 		)
 		passwordSizer.Add(self.tokenInputStars)
@@ -124,29 +145,62 @@ class ServicePanel(wx.Panel):
 		self.linkHref.Update()
 		self.linkHref.Show(show=self.tokenInput.GetValue() == secret.password)
 		addonHelper.sizer.Fit(self)
+		self.Thaw()
+		# The options are saved only if the user has changed any of them
+		self._changed: bool = False
+		for eventType in (wx.EVT_CHOICE, wx.EVT_CHECKBOX, wx.EVT_TEXT):
+			self.Bind(eventType, self.onChange)
 
-	def widgetMaker(self, widget: wx.Choice, languages: Iterator[ServiceLanguage]) -> None:
+	def widgetMaker(self, widget: wx.Choice, languages: Iterable[ServiceLanguage]) -> Dict[str, int]:
 		"""Creating a widget based on the sequence of Language classes to display it in a wx.Choice object.
 		@param widget: widget based on a sequence of Language classes
 		@type widget: wx.Choice
 		@param languages: list of languages available in the dictionary
-		@type languages: Iterator[ServiceLanguage]
+		@type languages: Iterable[ServiceLanguage]
+		@return: positions of the added languages in the widget by their codes
+		@rtype: Dict[str, int]
 		"""
 		# Translators: This displayed by default in the language selection choice list
 		widget.SetLabel(_("-- select language --"))
-		for lang in languages:
-			widget.Append(lang.name, lang)
+		# The control is not redrawn until all items are added
+		widget.Freeze()
+		# Languages are sorted once here instead of by the native control on each insertion
+		languages = sorted(languages, key=lambda lang: strxfrm(lang.name))
+		positions: Dict[str, int] = {}
+		if languages:
+			first: int = widget.GetCount()
+			widget.Append([lang.name for lang in languages])
+			for index, lang in enumerate(languages, start=first):
+				widget.SetClientData(index, lang)
+				positions[lang.code] = index
+		widget.Thaw()
+		return positions
+
+	def onChange(self, event: wx.PyEvent) -> None:
+		"""Mark the panel options as changed by the user.
+		@param event: event of any control of the panel which changes its value
+		@type event: wx.PyEvent
+		"""
+		self._changed = True
+		event.Skip()
 
 	def onSelectFrom(self, event: wx.PyEvent) -> None:
 		"""Filling in the list of available destination languages when selecting the source language.
 		@param event: event indicating the selection of an item in the wx.Choice object
 		@type event: wx.PyEvent
 		"""
+		self._changed = True
 		fromLang: str = self.fromChoice.GetClientData(self.fromChoice.GetSelection()).code
-		self.intoChoice.Clear()
-		self.widgetMaker(self.intoChoice, langs.intoList(fromLang))
-		intoLang: int = self.intoChoice.FindString(langs[config.conf[addonName][serviceName]['into']].name)
-		self.intoChoice.Select(intoLang if intoLang >= 0 else 0)
+		targets: List[ServiceLanguage] = intoChoices(fromLang)
+		# Many source languages share the same targets, in this case the choice is not refilled
+		if _intoCodes[fromLang] != self._intoCodes:
+			# The control is not redrawn while its items are replaced
+			self.intoChoice.Freeze()
+			self.intoChoice.Clear()
+			self._intoIndex = self.widgetMaker(self.intoChoice, targets)
+			self.intoChoice.Thaw()
+			self._intoCodes = _intoCodes[fromLang]
+		self.intoChoice.Select(self._intoIndex.get(config.conf[addonName][serviceName]['into'], 0))
 
 	def onTokenButton(self, event: wx.PyEvent) -> None:
 		"""Toggle TextCtrl fields that show or hide the entered password.
@@ -174,12 +228,15 @@ class ServicePanel(wx.Panel):
 
 	def save(self) -> None:
 		"""Save the state of the service panel settings."""
+		if not self._changed:
+			return
 		fromLang: str = self.fromChoice.GetClientData(self.fromChoice.GetSelection()).code
 		intoLang: str = self.intoChoice.GetClientData(self.intoChoice.GetSelection()).code
-		config.conf[addonName][serviceName]['from'] = fromLang
-		config.conf[addonName][serviceName]['into'] = intoLang
-		config.conf[addonName][serviceName]['copytoclip'] = self.copyToClipboardChk.GetValue()
-		config.conf[addonName][serviceName]['autoswap'] = self.autoSwapChk.GetValue()
-		config.conf[addonName][serviceName]['mirror'] = self.useMirrorChk.GetValue()
-		config.conf[addonName][serviceName]['password'] = secrets[serviceName].encode(
+		section = config.conf[addonName][serviceName]
+		section['from'] = fromLang
+		section['into'] = intoLang
+		section['copytoclip'] = self.copyToClipboardChk.GetValue()
+		section['autoswap'] = self.autoSwapChk.GetValue()
+		section['mirror'] = self.useMirrorChk.GetValue()
+		section['password'] = secrets[serviceName].encode(
 			self.tokenInput.GetValue() or secrets[serviceName].password)
@@ -0,0 +1,74 @@
+# nvdaStubs.py
+# Replacements for the NVDA modules, so that the add-on modules can be imported outside of NVDA
+# A part of the NVDA Quick Dictionary add-on
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
+
+from typing import Any
+import os.path
+import sys
+import builtins
+import logging
+import tempfile
+from types import ModuleType
+
+addonName: str = 'quickDictionary'
+addonPath: str = os.path.join(
+	os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'addon', 'globalPlugins', addonName)
+configPath: str = tempfile.mkdtemp(prefix=addonName)
+
+
+def module(name: str, **attrs: Any) -> ModuleType:
+	"""Create an empty module with the specified attributes and register it in sys.modules.
+	@param name: full name of the module
+	@type name: str
+	@param attrs: attributes of the module
+	@type attrs: Any
+	@return: registered module
+	@rtype: ModuleType
+	"""
+	mod = ModuleType(name)
+	mod.__dict__.update(attrs)
+	sys.modules[name] = mod
+	return mod
+
+
+class AddonError(Exception):
+	"""Raised by addonHandler when the add-on is not installed."""
+
+
+def initTranslation() -> None:
+	"""The tests are not run from an installed add-on."""
+	raise AddonError()
+
+
+class Synth(object):
+	"""Synthesizer which is always active."""
+	name: str = 'oneCore'
+
+	def saveSettings(self) -> None:
+		pass
+
+
+builtins._ = lambda msg: msg
+module('addonHandler', initTranslation=initTranslation, AddonError=AddonError)
+log = logging.getLogger(addonName)
+log.addHandler(logging.NullHandler())
+module('logHandler', log=log)
+module('languageHandler', getLanguageDescription=lambda code: None)
+module('config', conf={
+	addonName: {'active': 0, 'yandex': {'mirror': False, 'password': ''}},
+	'speech': {Synth.name: {}}},
+	getUserDefaultConfigPath=lambda: configPath, isAppX=False)
+module('synthDriverHandler', getSynth=lambda: Synth(), setSynth=lambda name: True)
+module('tones', beep=lambda hz, length: None)
+module('textInfos', POSITION_SELECTION='selection')
+module('speech')
+module('speech.commands', LangChangeCommand=object, CallbackCommand=object)
+for name in ('api', 'ui', 'braille', 'versionInfo'):
+	module(name)
+# the package is registered without running its __init__.py, which needs the whole NVDA GUI
+module(addonName, __path__=[addonPath], addonName=addonName)
+# the services are registered by the tests themselves, the real locator imports their settings panels
+locator = module(addonName + '.locator', services=[])
@@ -0,0 +1,86 @@
+# test_connections.py
+# Tests of the persistent HTTPS connections to the online dictionaries servers
+# A part of the NVDA Quick Dictionary add-on
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
+
+from typing import Any, List, Optional
+import socket
+import unittest
+from http.client import RemoteDisconnected
+from types import SimpleNamespace
+from unittest import mock
+from . import nvdaStubs  # noqa F401
+from quickDictionary import connections
+
+
+class FakeConnection(object):
+	"""Replaces HTTPSConnection, the request either fails with the given error or returns an empty article."""
+
+	def __init__(self, error: Optional[Exception] = None, sock: Optional[object] = None) -> None:
+		self.error: Optional[Exception] = error
+		self.sock: Optional[object] = sock
+		self.requests: int = 0
+		self.closed: bool = False
+
+	def request(self, method: str, path: str, headers=None) -> None:
+		self.requests += 1
+		if self.error:
+			raise self.error
+		self.sock = object()
+
+	def getresponse(self) -> SimpleNamespace:
+		return SimpleNamespace(
+			status=200, will_close=False, read=lambda: b'{}', getheader=lambda name, default=None: default)
+
+	def close(self) -> None:
+		self.closed = True
+		self.sock = None
+
+
+class TestFetch(unittest.TestCase):
+
+	def setUp(self) -> None:
+		connections._pool.clear()
+		self.created: List[FakeConnection] = []
+
+	def tearDown(self) -> None:
+		connections._pool.clear()
+
+	def connect(self, error: Optional[Exception] = None) -> Any:
+		"""Replace the opening of new connections, all of them will behave in the same way."""
+		def create(*args, **kwargs) -> FakeConnection:
+			conn = FakeConnection(error)
+			self.created.append(conn)
+			return conn
+		return mock.patch.object(connections, 'HTTPSConnection', side_effect=create)
+
+	def test_timeoutIsNotRepeated(self) -> None:
+		with self.connect(socket.timeout("timed out")):
+			with self.assertRaises(socket.timeout):
+				connections.fetch("https://example.com/api", {})
+		self.assertEqual(len(self.created), 1)
+		self.assertEqual(self.created[0].requests, 1)
+		self.assertTrue(self.created[0].closed)
+
+	def test_resetOfNewConnectionIsNotRepeated(self) -> None:
+		with self.connect(ConnectionResetError()):
+			with self.assertRaises(ConnectionResetError):
+				connections.fetch("https://example.com/api", {})
+		self.assertEqual(len(self.created), 1)
+
+	def test_staleConnectionIsReplaced(self) -> None:
+		stale = FakeConnection(RemoteDisconnected("closed"), sock=object())
+		connections.releaseConnection("example.com", stale)
+		with self.connect():
+			resp, data = connections.fetch("https://example.com/api", {})
+		self.assertEqual(data, b'{}')
+		self.assertTrue(stale.closed)
+		self.assertEqual(len(self.created), 1)
+		# the new connection is kept for the next requests
+		self.assertEqual(connections._pool[("example.com", connections.defaultContext)], self.created)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,65 @@
+# test_yandex.py
+# Tests of the requests to the Yandex online dictionary
+# A part of the NVDA Quick Dictionary add-on
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2020-2023 Olexandr Gryshchenko <grisov.nvaccess@mailnull.com>
+
+from typing import Dict, List, Tuple
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from . import nvdaStubs
+from quickDictionary.yandex import api
+from quickDictionary.yandex.dictionary import ServiceTranslator
+from quickDictionary.shared import translateWithCaching
+from quickDictionary.cache import translationsCache
+
+_article: bytes = b'{"head": {}, "def": [{"text": "word", "pos": "noun", "tr": [{"text": "slovo"}]}]}'
+_forbidden: bytes = b'{"code": 401, "message": "API key is invalid"}'
+
+
+class FakeFetch(object):
+	"""Replaces connections.fetch and returns the same response from every server."""
+
+	def __init__(self, status: int, data: bytes) -> None:
+		self.status: int = status
+		self.data: bytes = data
+		self.urls: List[str] = []
+
+	def __call__(self, url: str, headers: Dict[str, str], context=None) -> Tuple[SimpleNamespace, bytes]:
+		self.urls.append(url)
+		return SimpleNamespace(status=self.status), self.data
+
+
+class TestYapiGet(unittest.TestCase):
+
+	def setUp(self) -> None:
+		nvdaStubs.locator.services[:] = [SimpleNamespace(translator=ServiceTranslator)]
+		translationsCache.clear()
+
+	def test_errorStatusIsNotParsed(self) -> None:
+		fetch = FakeFetch(403, _forbidden)
+		with mock.patch.object(api, 'fetch', fetch):
+			response = api.Yapi('word', 'en', 'ru').lookup()
+		self.assertIn('403', response['error'])
+		self.assertNotIn('code', response)
+		# the alternative server is tried before giving up
+		self.assertEqual(len(fetch.urls), 2)
+
+	def test_errorStatusIsNotCached(self) -> None:
+		with mock.patch.object(api, 'fetch', FakeFetch(403, _forbidden)):
+			translator = translateWithCaching('en', 'ru', 'word', 'hash')
+		self.assertTrue(translator.error)
+		self.assertIsNone(translationsCache.get(translationsCache.key(0, 'en', 'ru', 'word', 'hash')))
+
+	def test_articleIsCached(self) -> None:
+		with mock.patch.object(api, 'fetch', FakeFetch(200, _article)):
+			translator = translateWithCaching('en', 'ru', 'word', 'hash')
+		self.assertFalse(translator.error)
+		self.assertIn('slovo', translator.plaintext)
+		self.assertIsNotNone(translationsCache.get(translationsCache.key(0, 'en', 'ru', 'word', 'hash')))
+
+
+if __name__ == '__main__':
+	unittest.main()